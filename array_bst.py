@@ -0,0 +1,497 @@
+'''Array Binary Search Tree Module
+
+ArrayBST Class:
+
+    Description:
+
+    Binary Search Tree for int or float keys where the nodes are not objects.
+    Instead, every node is an index into a set of parallel arrays (key, left index,
+    right index, parent index and height), using the array module. A missing child
+    or parent is stored as -1. Since there is no object per node, large trees use
+    far less memory than a BST and the whole tree can be copied as a handful of
+    buffers. Slots freed by remove are reused by later adds. Like BST, the tree can
+    be self balancing, in which case it is kept as an AVL tree.
+
+    __init__(typecode = "q", balancing = False): The typecode sets the type of the
+        keys, "q" for ints (64 bit) or "d" for floats. Self balancing is set the
+        same way as a BST.
+
+    Methods:
+
+    size(): Returns the amount of keys in the tree as an int. len(tree) gives the
+        same result.
+    is_empty(): Returns True if the tree has no keys, False otherwise.
+    height(): Returns the current height of the tree.
+    add(item, *args): Adds one or more keys to the tree, ignoring any that are
+        already in it. Returns self.
+    remove(item, *args): Removes one or more keys from the tree, ignoring any
+        that are not in it. Returns self.
+    find(item): Returns the key if it is found. If it is not found, a ValueError
+        is raised.
+    inorder(), preorder(), postorder(): Returns a list of the keys in that order.
+    snapshot(): Returns an independent copy of the tree. Only the arrays are
+        copied, so no work is done per node.
+
+    An ArrayBST can be iterated over in increasing order, and "item in tree" does
+    a search the same way as find.
+'''
+
+from array import array
+
+
+class ArrayBST:
+    '''Array Binary Search Tree Class:
+
+    Methods:
+        size()
+        is_empty()
+        height()
+        add(item, *args)
+        remove(item, *args)
+        find(item)
+        inorder()
+        preorder()
+        postorder()
+        snapshot()
+    '''
+
+
+    def __init__(self, typecode = "q", balancing = False):
+        '''ArrayBST object is instantiated empty. The typecode picks int ("q")
+        or float ("d") keys, and balancing can be turned on in the second arg
+        '''
+
+        if typecode not in ("q", "d"):
+            raise ValueError('typecode must be "q" or "d"')
+        if not isinstance(balancing, bool):
+            raise TypeError("balancing can only be type bool")
+
+        self._keys = array(typecode)
+        self._left = array("q")
+        self._right = array("q")
+        self._parent = array("q")
+        self._heights = array("i")
+
+        self._root = -1
+        self._free = -1     # first free slot, the rest are chained through _left
+        self._count = 0
+        self._self_balancing = balancing
+
+
+    def size(self):
+        '''Returns the amount of keys in the tree'''
+
+        return self._count
+
+
+    def __len__(self):
+        '''Returns the amount of keys in the tree'''
+
+        return self._count
+
+
+    def is_empty(self):
+        '''Returns True if the tree has no keys, False otherwise'''
+
+        return self._root == -1
+
+
+    def height(self):
+        '''Returns the height of the tree'''
+
+        if self._root == -1:
+            return 0
+        return self._heights[self._root]
+
+
+    def _new_slot(self, item, parent):
+        '''Stores the item in a free slot, or at the end of the arrays if there
+        are none, and returns its index
+        '''
+
+        if self._free != -1:
+            index = self._free
+            self._keys[index] = item    # first, so a bad item leaves the slot free
+            self._free = self._left[index]
+
+            self._left[index] = -1
+            self._right[index] = -1
+            self._parent[index] = parent
+            self._heights[index] = 0
+
+        else:
+            index = len(self._keys)
+
+            self._keys.append(item)
+            self._left.append(-1)
+            self._right.append(-1)
+            self._parent.append(parent)
+            self._heights.append(0)
+
+        return index
+
+
+    def _free_slot(self, index):
+        '''Adds the slot to the chain of free slots'''
+
+        self._left[index] = self._free
+        self._right[index] = -1
+        self._parent[index] = -1
+        self._free = index
+
+
+    def _fix_height(self, index):
+        '''Recomputes the height of a node from its children'''
+
+        heights = self._heights
+        left = self._left[index]
+        right = self._right[index]
+
+        left_height = -1
+        if left != -1:
+            left_height = heights[left]
+        right_height = -1
+        if right != -1:
+            right_height = heights[right]
+
+        if left_height >= right_height:
+            heights[index] = left_height + 1
+        else:
+            heights[index] = right_height + 1
+
+
+    def _bal_factor(self, index):
+        '''Returns the height of the left side minus the height of the
+        right side
+        '''
+
+        heights = self._heights
+        left = self._left[index]
+        right = self._right[index]
+
+        left_bal = 0
+        if left != -1:
+            left_bal = heights[left] + 1
+        right_bal = 0
+        if right != -1:
+            right_bal = heights[right] + 1
+
+        return left_bal - right_bal
+
+
+    def _replace_child(self, parent, old, new):
+        '''Points the parent (or the root if there is no parent) at new
+        instead of old
+        '''
+
+        if parent == -1:
+            self._root = new
+        elif self._left[parent] == old:
+            self._left[parent] = new
+        else:
+            self._right[parent] = new
+
+
+    def _rotate_left(self, index):
+        '''Rotates left at the node, returning the index of the new top'''
+
+        left = self._left
+        right = self._right
+        parents = self._parent
+
+        top = right[index]
+        child = left[top]
+
+        right[index] = child
+        if child != -1:
+            parents[child] = index
+
+        parent = parents[index]
+        parents[top] = parent
+        self._replace_child(parent, index, top)
+
+        left[top] = index
+        parents[index] = top
+
+        self._fix_height(index)
+        self._fix_height(top)
+
+        return top
+
+
+    def _rotate_right(self, index):
+        '''Rotates right at the node, returning the index of the new top'''
+
+        left = self._left
+        right = self._right
+        parents = self._parent
+
+        top = left[index]
+        child = right[top]
+
+        left[index] = child
+        if child != -1:
+            parents[child] = index
+
+        parent = parents[index]
+        parents[top] = parent
+        self._replace_child(parent, index, top)
+
+        right[top] = index
+        parents[index] = top
+
+        self._fix_height(index)
+        self._fix_height(top)
+
+        return top
+
+
+    def _retrace(self, index):
+        '''Walks from the node up to the root, fixing heights and rotating any
+        node out of balance if self balancing is enabled
+        '''
+
+        balancing = self._self_balancing
+
+        while index != -1:
+            self._fix_height(index)
+
+            if balancing:
+                node_fact = self._bal_factor(index)
+
+                if node_fact > 1:
+                    if self._bal_factor(self._left[index]) < 0:
+                        self._rotate_left(self._left[index])
+                    index = self._rotate_right(index)
+
+                elif node_fact < -1:
+                    if self._bal_factor(self._right[index]) > 0:
+                        self._rotate_right(self._right[index])
+                    index = self._rotate_left(index)
+
+            index = self._parent[index]
+
+
+    def _find_index(self, item):
+        '''Returns the index of the item, or -1 if it is not in the tree'''
+
+        keys = self._keys
+        left = self._left
+        right = self._right
+
+        index = self._root
+        while index != -1:
+            key = keys[index]
+            if item < key:
+                index = left[index]
+            elif item > key:
+                index = right[index]
+            else:
+                return index
+
+        return -1
+
+
+    def add(self, item, *args):
+        '''Adds one or more keys to the tree. Keys already in the tree are
+        ignored. Returns self
+        '''
+
+        self._insert(item)
+
+        for arg in args:
+            self._insert(arg)
+
+        return self
+
+
+    def _insert(self, item):
+        '''Inserts a single key, then retraces from its parent'''
+
+        if self._root == -1:
+            self._root = self._new_slot(item, -1)
+            self._count += 1
+            return
+
+        keys = self._keys
+        left = self._left
+        right = self._right
+
+        index = self._root
+        while True:
+            key = keys[index]
+            if item < key:
+                if left[index] == -1:
+                    left[index] = self._new_slot(item, index)
+                    break
+                index = left[index]
+            elif item > key:
+                if right[index] == -1:
+                    right[index] = self._new_slot(item, index)
+                    break
+                index = right[index]
+            else:
+                return
+
+        self._count += 1
+        self._retrace(index)
+
+
+    def remove(self, item, *args):
+        '''Removes one or more keys from the tree. Keys not in the tree are
+        ignored. Returns self
+        '''
+
+        self._delete(item)
+
+        for arg in args:
+            self._delete(arg)
+
+        return self
+
+
+    def _delete(self, item):
+        '''Removes a single key, then retraces from where the tree changed'''
+
+        index = self._find_index(item)
+        if index == -1:
+            return
+
+        left = self._left
+        right = self._right
+
+        # a node with two children takes the key of its successor, which
+        # has at most one child and is unlinked instead
+        if (left[index] != -1) and (right[index] != -1):
+            successor = right[index]
+            while left[successor] != -1:
+                successor = left[successor]
+            self._keys[index] = self._keys[successor]
+            index = successor
+
+        child = left[index]
+        if child == -1:
+            child = right[index]
+
+        parent = self._parent[index]
+        if child != -1:
+            self._parent[child] = parent
+        self._replace_child(parent, index, child)
+
+        self._free_slot(index)
+        self._count -= 1
+        self._retrace(parent)
+
+
+    def find(self, item):
+        '''Searches for an item in the tree, returning the key if found. If it
+        is not found, a ValueError is raised
+        '''
+
+        if self._root == -1:
+            raise ValueError("Tree is empty")
+
+        index = self._find_index(item)
+        if index == -1:
+            raise ValueError("Item not found in tree")
+
+        return self._keys[index]
+
+
+    def __contains__(self, item):
+        '''Returns True if the item is in the tree, False otherwise'''
+
+        return self._find_index(item) != -1
+
+
+    def __iter__(self):
+        '''Iterates over the keys in increasing order'''
+
+        keys = self._keys
+        left = self._left
+        right = self._right
+
+        stack = []
+        index = self._root
+        while (len(stack) > 0) or (index != -1):
+            while index != -1:
+                stack.append(index)
+                index = left[index]
+
+            index = stack.pop()
+            yield keys[index]
+            index = right[index]
+
+
+    def inorder(self):
+        '''Returns a list of the tree in order of inorder traversal'''
+
+        return list(self)
+
+
+    def preorder(self):
+        '''Returns a list of the tree in order of preorder traversal'''
+
+        keys = self._keys
+        left = self._left
+        right = self._right
+
+        preorder_list = []
+        stack = []
+        if self._root != -1:
+            stack.append(self._root)
+
+        while len(stack) > 0:
+            index = stack.pop()
+            preorder_list.append(keys[index])
+            if right[index] != -1:
+                stack.append(right[index])
+            if left[index] != -1:
+                stack.append(left[index])
+
+        return preorder_list
+
+
+    def postorder(self):
+        '''Returns a list of the tree in order of postorder traversal'''
+
+        keys = self._keys
+        left = self._left
+        right = self._right
+
+        # reversed preorder that visits right before left is postorder
+        postorder_list = []
+        stack = []
+        if self._root != -1:
+            stack.append(self._root)
+
+        while len(stack) > 0:
+            index = stack.pop()
+            postorder_list.append(keys[index])
+            if left[index] != -1:
+                stack.append(left[index])
+            if right[index] != -1:
+                stack.append(right[index])
+
+        postorder_list.reverse()
+        return postorder_list
+
+
+    def snapshot(self):
+        '''Returns an independent copy of the tree. Each array is copied as a
+        single buffer, so no work is done per node
+        '''
+
+        new_tree = ArrayBST(self._keys.typecode, self._self_balancing)
+
+        new_tree._keys = self._keys[:]
+        new_tree._left = self._left[:]
+        new_tree._right = self._right[:]
+        new_tree._parent = self._parent[:]
+        new_tree._heights = self._heights[:]
+
+        new_tree._root = self._root
+        new_tree._free = self._free
+        new_tree._count = self._count
+
+        return new_tree
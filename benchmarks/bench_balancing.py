@@ -0,0 +1,99 @@
+'''Balancing Benchmark
+
+Compares the self balancing strategies of the BST on the same streams of keys
+as the benchmark suite. Every key of the stream is added one at a time, each
+key is then searched for, and half of the keys are removed, all in a
+shuffled order. The times are taken without stats, then the same work is
+repeated with stats enabled to count the rotations each add and remove made.
+The height after the adds shows how much each strategy gives up in search
+depth for its fewer rotations.
+
+Without balancing, the ordered streams build a tree as high as its size, so
+those runs are left out above 2000 keys.
+
+Usage: python benchmarks/bench_balancing.py [size ...]
+'''
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from bst import BST, TreeStats
+from bench_suite import STREAMS, make_keys
+
+
+MODES = ("avl", "red_black", "weight_balanced", "none")
+DEGENERATE_MAX = 2000
+
+
+def run(keys, lookups, balancing, stats = None):
+    '''Adds every key, finds every lookup and removes the first half of the
+    lookups, returning the seconds spent on each along with the height after
+    the adds and the rotations made by the adds
+    '''
+
+    tree = BST(None, balancing)
+    if stats is not None:
+        tree.enable_stats(stats)
+
+    start = time.perf_counter()
+    for key in keys:
+        tree.add(key)
+    add_time = time.perf_counter() - start
+
+    height = tree.height()
+    add_rotations = 0
+    if stats is not None:
+        add_rotations = stats.single_rotations + stats.double_rotations
+
+    start = time.perf_counter()
+    for key in lookups:
+        tree.find(key)
+    find_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for key in lookups[:len(lookups) // 2]:
+        tree.remove(key)
+    remove_time = time.perf_counter() - start
+
+    return (add_time, find_time, remove_time, height, add_rotations)
+
+
+def main(sizes):
+    '''Prints the times, height and rotations of each strategy for each size
+    and stream
+    '''
+
+    print(f"{'size':>8} {'stream':>11} {'balancing':>15} {'add s':>8} {'find s':>8} "
+          f"{'remove s':>8} {'height':>7} {'rot/add':>8} {'rot/remove':>10}")
+
+    for size in sizes:
+        for stream in STREAMS:
+            keys = make_keys(size, stream)
+            lookups = keys[:]
+            random.Random(size + 1).shuffle(lookups)
+
+            for balancing in MODES:
+                if (balancing == "none") and (stream != "random") and (size > DEGENERATE_MAX):
+                    print(f"{size:>8} {stream:>11} {balancing:>15}  skipped")
+                    continue
+
+                add_time, find_time, remove_time, height, _ = run(keys, lookups, balancing)
+
+                stats = TreeStats()
+                _, _, _, _, add_rotations = run(keys, lookups, balancing, stats)
+                remove_rotations = stats.single_rotations + stats.double_rotations - add_rotations
+
+                print(f"{size:>8} {stream:>11} {balancing:>15} {add_time:>8.3f} {find_time:>8.3f} "
+                      f"{remove_time:>8.3f} {height:>7} {add_rotations / size:>8.3f} "
+                      f"{remove_rotations / (size // 2):>10.3f}")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        main([int(arg) for arg in sys.argv[1:]])
+    else:
+        main([1000, 10000, 100000])
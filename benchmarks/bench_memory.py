@@ -0,0 +1,51 @@
+'''Memory Benchmark
+
+Builds trees of increasing size and reports how many bytes of memory each key
+costs, measured with tracemalloc. The keys themselves are allocated before
+measuring starts, so only the tree structure is counted.
+
+Usage: python benchmarks/bench_memory.py [size ...]
+'''
+
+import os
+import random
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from bst import BST
+
+
+def bytes_per_key(size, balancing):
+    '''Returns the bytes of memory per key used by a tree of the given size,
+    built by adding shuffled keys one at a time
+    '''
+
+    keys = list(range(size))
+    random.Random(size).shuffle(keys)
+
+    tracemalloc.start()
+    tree = BST(None, balancing)
+    for key in keys:
+        tree.add(key)
+    used = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    return used / size
+
+
+def main(sizes):
+    '''Prints the bytes per key for each size, with and without balancing'''
+
+    print(f"{'size':>10} {'balancing':>10} {'bytes/key':>10}")
+    for size in sizes:
+        for balancing in (True, False):
+            print(f"{size:>10} {str(balancing):>10} {bytes_per_key(size, balancing):>10.1f}")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        main([int(arg) for arg in sys.argv[1:]])
+    else:
+        main([1000, 10000, 100000])
@@ -0,0 +1,67 @@
+'''Render Benchmark
+
+Times drawing trees of increasing size with print_tree. Two times are reported
+for each tree: working out where every label and branch goes, and building
+the rows of text. The first grows with the amount of nodes, the second with
+the size of the drawing (rows times columns), which is the least any drawing
+can cost. Balanced trees are built from sorted keys, random ones by adding
+shuffled keys without balancing.
+
+Usage: python benchmarks/bench_render.py [size ...]
+'''
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from bst import BST
+
+
+def build(size, shape):
+    '''Returns a tree of the given size and shape'''
+
+    if shape == "balanced":
+        return BST.from_sorted(range(size))
+
+    keys = list(range(size))
+    random.Random(size).shuffle(keys)
+    tree = BST()
+    for key in keys:
+        tree.add(key)
+    return tree
+
+
+def time_render(tree):
+    '''Returns the rows and columns of the drawing, along with the seconds
+    spent on the layout and on the whole drawing
+    '''
+
+    start = time.perf_counter()
+    width, height, labels, branches = tree._layout()
+    layout = time.perf_counter() - start
+
+    start = time.perf_counter()
+    tree._tree_to_str_list()
+    total = time.perf_counter() - start
+
+    return (height, width, layout, total)
+
+
+def main(sizes):
+    '''Prints the render times for each size and shape'''
+
+    print(f"{'size':>8} {'shape':>9} {'rows':>7} {'columns':>8} {'layout s':>9} {'total s':>9}")
+    for size in sizes:
+        for shape in ("balanced", "random"):
+            height, width, layout, total = time_render(build(size, shape))
+            print(f"{size:>8} {shape:>9} {height:>7} {width:>8} {layout:>9.4f} {total:>9.4f}")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        main([int(arg) for arg in sys.argv[1:]])
+    else:
+        main([100, 300, 1000, 3000])
@@ -0,0 +1,320 @@
+'''Benchmark Suite
+
+Times the main operations of a BST over several streams of keys, with and
+without self balancing, at sizes from a thousand to a million items. Every
+single add, find and remove is timed, so each result has both the throughput
+and the latency percentiles. The results are written as JSON so that runs of
+different versions can be compared, either by hand or with --compare.
+
+Key streams (the keys are always 0 to size - 1):
+    sequential: keys in increasing order.
+    random: the keys shuffled.
+    adversarial: keys taken from both ends of the sorted keys in turn
+        (0, n - 1, 1, n - 2, ...). Without balancing, this builds a zig zag
+        chain, and with balancing it rotates at almost every add.
+
+Operations:
+    add: adds every key to an empty tree, one at a time.
+    find: searches for every key, in a shuffled order.
+    remove: removes every key, in a shuffled order.
+    inorder, preorder, postorder: a full traversal into a list.
+    balance: balance() on a tree built from the stream. Without balancing,
+        this is the full rebuild; with it, only the check that nothing is
+        needed.
+    print_tree: draws the tree into a StringIO. A full drawing grows with the
+        square of the size, so it is only drawn in full up to --render-max
+        items. Larger trees are previewed with max_depth and max_width.
+
+Without balancing, the sequential and adversarial streams build a tree as
+high as its size, so every add, find and remove costs O(n). Those runs are
+left out above --degenerate-max items, and are listed as skipped in the JSON.
+
+Progress and comparisons are printed to stderr, and the JSON goes to stdout
+unless --output is given.
+
+--balancing takes on and off, or the name of a self balancing strategy
+(avl, red_black, weight_balanced or none) to compare the strategies.
+
+Usage: python benchmarks/bench_suite.py [--sizes N ...] [--streams S ...]
+           [--ops OP ...] [--balancing on|off|STRATEGY ...] [--repeat N]
+           [--output FILE] [--compare FILE]
+'''
+
+import argparse
+import io
+import json
+import os
+import platform
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from bst import BST
+
+
+STREAMS = ("sequential", "random", "adversarial")
+BALANCINGS = ("on", "off", "avl", "red_black", "weight_balanced", "none")
+OPS = ("add", "find", "remove", "inorder", "preorder", "postorder", "balance", "print_tree")
+PERCENTILES = (50, 90, 99, 99.9)
+
+
+def make_keys(size, stream):
+    '''Returns the keys 0 to size - 1 in the order of the stream'''
+
+    if stream == "sequential":
+        return list(range(size))
+
+    if stream == "random":
+        keys = list(range(size))
+        random.Random(size).shuffle(keys)
+        return keys
+
+    keys = []
+    low = 0
+    high = size - 1
+    while low <= high:
+        keys.append(low)
+        if low != high:
+            keys.append(high)
+        low += 1
+        high -= 1
+    return keys
+
+
+def build(keys, balancing):
+    '''Returns a tree made by adding the keys one at a time'''
+
+    tree = BST(None, balancing)
+    for key in keys:
+        tree.add(key)
+    return tree
+
+
+def time_each(function, items):
+    '''Calls the function once for each item, returning how long each call
+    took in nanoseconds
+    '''
+
+    clock = time.perf_counter_ns
+    latencies = []
+    for item in items:
+        start = clock()
+        function(item)
+        latencies.append(clock() - start)
+    return latencies
+
+
+def time_calls(function, repeat, setup = None):
+    '''Calls the function repeat times, returning how long each call took in
+    nanoseconds. If setup is given, it is called before each call without
+    being timed, and what it returns is passed to the function
+    '''
+
+    clock = time.perf_counter_ns
+    latencies = []
+    for _ in range(repeat):
+        arg = None
+        if setup is not None:
+            arg = setup()
+        start = clock()
+        if setup is not None:
+            function(arg)
+        else:
+            function()
+        latencies.append(clock() - start)
+    return latencies
+
+
+def summarize(latencies, items):
+    '''Returns the throughput and latency percentiles of a list of latencies,
+    where the calls handled items in total
+    '''
+
+    ordered = sorted(latencies)
+    total = sum(ordered)
+
+    percentiles = {}
+    for percentile in PERCENTILES:
+        index = int(round((percentile / 100) * (len(ordered) - 1)))
+        percentiles[f"p{percentile:g}"] = ordered[index]
+    percentiles["max"] = ordered[-1]
+
+    per_second = None
+    if total > 0:
+        per_second = items / (total / 1e9)
+
+    return {
+        "calls": len(ordered),
+        "items": items,
+        "seconds": total / 1e9,
+        "items_per_second": per_second,
+        "latency_ns": percentiles,
+    }
+
+
+def draw(tree, render_max):
+    '''Draws the tree into a StringIO, in full if it is small enough, or as a
+    preview otherwise
+    '''
+
+    stream = io.StringIO()
+    if tree.size() <= render_max:
+        tree.print_tree(stream=stream)
+    else:
+        tree.print_tree(stream=stream, max_depth=8, max_width=200)
+    return stream
+
+
+def run_case(size, stream, balancing, ops, repeat, render_max):
+    '''Runs the chosen operations for one size, stream and balancing setting,
+    returning a result for each
+    '''
+
+    keys = make_keys(size, stream)
+    lookups = keys[:]
+    random.Random(size + 1).shuffle(lookups)
+
+    results = {}
+
+    if "add" in ops:
+        tree = BST(None, balancing)
+        results["add"] = summarize(time_each(tree.add, keys), size)
+    else:
+        tree = build(keys, balancing)
+
+    if "find" in ops:
+        results["find"] = summarize(time_each(tree.find, lookups), size)
+
+    for name in ("inorder", "preorder", "postorder"):
+        if name in ops:
+            results[name] = summarize(time_calls(getattr(tree, name), repeat), size * repeat)
+
+    if "print_tree" in ops:
+        results["print_tree"] = summarize(time_calls(lambda: draw(tree, render_max), repeat), size * repeat)
+        results["print_tree"]["full"] = size <= render_max
+
+    if "balance" in ops:
+        # balance changes the tree, so each call gets a new one
+        latencies = time_calls(BST.balance, repeat, lambda: build(keys, balancing))
+        results["balance"] = summarize(latencies, size * repeat)
+
+    if "remove" in ops:
+        results["remove"] = summarize(time_each(tree.remove, lookups), size)
+        assert tree.is_empty(), "tree is not empty after removing every key"
+
+    return results
+
+
+def compare(old, new):
+    '''Prints how the throughput and p99 latency of each result changed from
+    an older run
+    '''
+
+    def key(result):
+        return (result["size"], result["stream"], result["balancing"], result["op"])
+
+    old_results = {}
+    for result in old["results"]:
+        if "skipped" not in result:
+            old_results[key(result)] = result
+
+    print(f"{'size':>8} {'stream':>11} {'balancing':>9} {'op':>10} {'speed':>8} {'p99':>8}", file=sys.stderr)
+    for result in new["results"]:
+        if ("skipped" in result) or (key(result) not in old_results):
+            continue
+        before = old_results[key(result)]
+
+        speed = "-"
+        if before["items_per_second"] and result["items_per_second"]:
+            speed = f"{result['items_per_second'] / before['items_per_second']:.2f}x"
+        p99 = "-"
+        if before["latency_ns"]["p99"] > 0:
+            p99 = f"{result['latency_ns']['p99'] / before['latency_ns']['p99']:.2f}x"
+
+        print(f"{result['size']:>8} {result['stream']:>11} {str(result['balancing']):>9} "
+              f"{result['op']:>10} {speed:>8} {p99:>8}", file=sys.stderr)
+
+
+def main(args):
+    '''Runs every case and writes the JSON'''
+
+    # on and off stay bools so results can be compared with older runs
+    balancings = []
+    for setting in args.balancing:
+        if setting in ("on", "off"):
+            balancings.append(setting == "on")
+        else:
+            balancings.append(setting)
+
+    report = {
+        "format": 1,
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "machine": platform.machine(),
+        "time": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "settings": {
+            "sizes": args.sizes,
+            "streams": args.streams,
+            "ops": args.ops,
+            "balancing": balancings,
+            "repeat": args.repeat,
+            "render_max": args.render_max,
+            "degenerate_max": args.degenerate_max,
+        },
+        "results": [],
+    }
+
+    for size in args.sizes:
+        for stream in args.streams:
+            for balancing in balancings:
+                case = {"size": size, "stream": stream, "balancing": balancing}
+
+                if (balancing in (False, "none")) and (stream != "random") and (size > args.degenerate_max):
+                    report["results"].append(dict(case, skipped="degenerate tree above --degenerate-max"))
+                    print(f"{size:>8} {stream:>11} balancing={balancing}: skipped", file=sys.stderr)
+                    continue
+
+                start = time.perf_counter()
+                results = run_case(size, stream, balancing, args.ops, args.repeat, args.render_max)
+                for op in args.ops:
+                    report["results"].append(dict(case, op=op, **results[op]))
+
+                print(f"{size:>8} {stream:>11} balancing={balancing}: "
+                      f"{time.perf_counter() - start:.1f}s", file=sys.stderr)
+
+    if args.output is not None:
+        with open(args.output, "w") as file:
+            json.dump(report, file, indent=1)
+            file.write("\n")
+    else:
+        json.dump(report, sys.stdout, indent=1)
+        sys.stdout.write("\n")
+
+    if args.compare is not None:
+        with open(args.compare) as file:
+            compare(json.load(file), report)
+
+
+def parse_args(argv):
+    '''Returns the parsed command line arguments'''
+
+    parser = argparse.ArgumentParser(description="Benchmark suite for the BST")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000, 1000000])
+    parser.add_argument("--streams", nargs="+", choices=STREAMS, default=list(STREAMS))
+    parser.add_argument("--ops", nargs="+", choices=OPS, default=list(OPS))
+    parser.add_argument("--balancing", nargs="+", choices=BALANCINGS, default=["on", "off"])
+    parser.add_argument("--repeat", type=int, default=3,
+                        help="calls of each whole tree operation (traversals, balance, print_tree)")
+    parser.add_argument("--render-max", type=int, default=2000,
+                        help="largest tree that print_tree draws in full")
+    parser.add_argument("--degenerate-max", type=int, default=2000,
+                        help="largest unbalanced tree built from an ordered stream")
+    parser.add_argument("--output", help="file to write the JSON to, instead of stdout")
+    parser.add_argument("--compare", help="JSON from an earlier run to compare against")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    main(parse_args(sys.argv[1:]))
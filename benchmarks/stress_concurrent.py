@@ -0,0 +1,191 @@
+'''Concurrent Stress Test
+
+Runs writer and reader threads against one ConcurrentBST at the same time.
+Each writer adds and removes keys from its own range, so the final contents
+of the tree are known. While they run, the readers check that find returns
+the very key searched for, and take snapshots and check that every snapshot
+is a valid tree: items in order, correct parent links, correct stored heights
+and sizes, and, if self balancing, AVL balance. The final tree is checked the
+same way and compared against what the writers did.
+
+Usage: python benchmarks/stress_concurrent.py [writers] [readers] [operations]
+'''
+
+import os
+import random
+import sys
+import threading
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from concurrent_bst import ConcurrentBST
+
+
+KEYS_PER_WRITER = 1000
+
+
+def check_invariants(tree, balancing):
+    '''Raises an AssertionError if the BST breaks any of its invariants'''
+
+    if tree.is_empty():
+        assert tree.size() == 0, "empty tree has a size"
+        return
+
+    # postorder walk, so children are checked before their parent
+    heights = {}
+    stack = [(tree, None, None, False)]
+    while len(stack) > 0:
+        node, low, high, visited = stack.pop()
+
+        if not visited:
+            assert (low is None) or (node.node > low), "items out of order"
+            assert (high is None) or (node.node < high), "items out of order"
+
+            stack.append((node, low, high, True))
+            if node.left is not None:
+                assert node.left.parent is node, "bad parent link"
+                stack.append((node.left, low, node.node, False))
+            if node.right is not None:
+                assert node.right.parent is node, "bad parent link"
+                stack.append((node.right, node.node, high, False))
+            continue
+
+        left_height = -1
+        left_size = 0
+        if node.left is not None:
+            left_height = heights.pop(id(node.left))
+            left_size = node.left._size
+
+        right_height = -1
+        right_size = 0
+        if node.right is not None:
+            right_height = heights.pop(id(node.right))
+            right_size = node.right._size
+
+        height = max(left_height, right_height) + 1
+        assert node._height == height, "stored height is wrong"
+        assert node._size == left_size + right_size + 1, "stored size is wrong"
+        if balancing:
+            assert abs(left_height - right_height) <= 1, "tree is out of balance"
+
+        heights[id(node)] = height
+
+
+def writer(tree, index, operations, expected, errors):
+    '''Adds and removes random keys from the writers own range, keeping track
+    of what should be left in the tree
+    '''
+
+    try:
+        rand = random.Random(index)
+        low = index * KEYS_PER_WRITER
+        keys = set()
+
+        for _ in range(operations):
+            key = rand.randrange(low, low + KEYS_PER_WRITER)
+            choice = rand.random()
+
+            if choice < 0.5:
+                tree.add(key)
+                keys.add(key)
+            elif choice < 0.8:
+                tree.remove(key)
+                keys.discard(key)
+            elif choice < 0.9:
+                batch = [rand.randrange(low, low + KEYS_PER_WRITER) for _ in range(50)]
+                tree.add_many(batch)
+                keys.update(batch)
+            else:
+                batch = [rand.randrange(low, low + KEYS_PER_WRITER) for _ in range(50)]
+                tree.remove_many(batch)
+                keys.difference_update(batch)
+
+        expected[index] = keys
+
+    except Exception as error:
+        errors.append(error)
+
+
+def reader(tree, balancing, done, errors, counts):
+    '''Reads from the tree and checks snapshots until the writers are done'''
+
+    try:
+        rand = random.Random()
+        checks = 0
+
+        while not done.is_set():
+            key = rand.randrange(0, 10 * KEYS_PER_WRITER)
+
+            key in tree
+            # many finds per snapshot, to give writers a chance to move items
+            for value in range(key, key + 50):
+                try:
+                    assert tree.find(value) == value, "find returned another item"
+                except ValueError:
+                    pass
+            tree.count_range(key, key + 100)
+            items = tree.range(key, key + 100)
+            assert items == sorted(items), "range out of order"
+
+            snapshot = tree.snapshot()
+            check_invariants(snapshot, balancing)
+            checks += 1
+
+        counts.append(checks)
+
+    except Exception as error:
+        errors.append(error)
+
+
+def run(writers, readers, operations, balancing):
+    '''Runs one stress test and returns the amount of snapshots checked'''
+
+    tree = ConcurrentBST(None, balancing)
+    expected = {}
+    errors = []
+    counts = []
+    done = threading.Event()
+
+    writer_threads = [threading.Thread(target=writer, args=(tree, index, operations, expected, errors))
+                      for index in range(writers)]
+    reader_threads = [threading.Thread(target=reader, args=(tree, balancing, done, errors, counts))
+                      for _ in range(readers)]
+
+    for thread in reader_threads + writer_threads:
+        thread.start()
+    for thread in writer_threads:
+        thread.join()
+    done.set()
+    for thread in reader_threads:
+        thread.join()
+
+    if len(errors) > 0:
+        raise errors[0]
+
+    final = tree.snapshot()
+    check_invariants(final, balancing)
+
+    keys = set()
+    for index in expected:
+        keys.update(expected[index])
+    assert final.inorder() == sorted(keys), "tree does not match the writers"
+
+    return sum(counts)
+
+
+def main(writers, readers, operations):
+    '''Runs the stress test with and without balancing'''
+
+    # switch threads often to mix the operations as much as possible
+    sys.setswitchinterval(1e-6)
+
+    for balancing in (True, False):
+        checks = run(writers, readers, operations, balancing)
+        print(f"balancing={balancing}: {writers} writers x {operations} operations, "
+              f"{readers} readers, {checks} snapshots checked, ok")
+
+
+if __name__ == "__main__":
+    args = [int(arg) for arg in sys.argv[1:]]
+    defaults = [8, 4, 2000]
+    main(*(args + defaults[len(args):]))
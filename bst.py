@@ -8,21 +8,44 @@ BST Class:
 
     Binary Search Tree with option of self balancing. Each child is a subtree,
     meaning each child is its own BST and can be treated as a separate tree to
-    an extent (explained later). Doing this allows for recursion in most of its
-    methods. Note that a subtree contains a reference to its parent and is linked,
-    so it is not completely separate. Any BST can be printed to the terminal, although,
-    to keep most trees within a reasonable width, minimal whitespace is used between
-    nodes. The drawback of this is that some nodes on different branches may not line
-    up to each other when printed. There currently isn't an option to change the
-    behavior of the print function. If the tree is self balancing, this is less
-    likely to happen.
+    an extent (explained later), so most methods can be called on any subtree.
+    The methods themselves walk the tree with loops rather than recursion
+    (explained later). Note that a subtree contains a reference to its parent and
+    is linked, so it is not completely separate. Any BST can be printed to the
+    terminal, although, to keep most trees within a reasonable width, minimal
+    whitespace is used between nodes. The drawback of this is that some nodes on
+    different branches may not line up to each other when printed. If the tree is
+    self balancing, this is less likely to happen. The print can be sent to a file
+    or any stream, and cut to a depth or width for large trees (see print_tree).
 
     __init__(item = None, balancing = False): New BST objects can be instantiated
         with either 1 item (BST(item)) or no items (BST()). It is also possible to set
         the new tree to be self balancing, denoted by setting the second arg as True.
         If a new BST is needed to be empty and self balancing, setting the first arg
-        to None will work (BST(None, True)). It is possible to change the self
-        balancing feature in the future (explained later).
+        to None will work (BST(None, True)). The second arg can also name the self
+        balancing strategy: "avl" (the same as True), "red_black",
+        "weight_balanced" or "none" (the same as False). Any other name raises a
+        ValueError. It is possible to change the self balancing feature in the
+        future (explained later).
+
+    Self balancing strategies:
+
+    avl: Keeps the heights of the two sides of every node within 1 of each
+        other, giving the lowest trees and so the fastest searches. A remove
+        can rotate at every node on its path.
+    red_black: Colors each node red or black and keeps every path down with the
+        same amount of black nodes, with no red node under another. The tree
+        can be up to twice as high as a perfectly balanced one, but an add
+        rotates at most twice and a remove at most three times, and most
+        changes are fixed by recoloring alone, with no balance checks on the
+        way up. Suits streams that add a lot.
+    weight_balanced: Keeps the size of each side of every node within 3 times
+        the size of the other side, using the sizes the nodes already keep.
+    none: Never rotates.
+
+    All of them share the same add, remove and find. split and join are
+    O(log n) on an AVL tree, but rebuild red black and weight balanced trees
+    in O(n). balance() and is_balanced() always use the AVL rule.
 
     Attributes:
 
@@ -33,7 +56,15 @@ BST Class:
 
     Methods:
 
-    size(): Returns the amount of nodes present in a tree as an int.
+    from_sorted(items, balancing = False): Class method that builds a perfectly
+        balanced tree from items already in increasing order in O(n). Repeated
+        items are only added once. A ValueError is raised if the items are not
+        in order. Useful for loading a lot of data at once.
+    from_iterable(items, balancing = False): Class method that sorts the items
+        first, then builds the tree the same way as from_sorted.
+    size(): Returns the amount of nodes present in a tree as an int. This is O(1),
+        since each node keeps track of the size of its subtree. len(tree) gives
+        the same result.
     is_empty(): Returns True if the root is None, False otherwise.
     height(): Returns the current height of the tree.
     add(item, *args): Adds an item to the tree in the appropriate spot; rebalances
@@ -42,7 +73,7 @@ BST Class:
         BST and add it to the current tree. If an item is already in the tree, it
         is ignored. Returns self, allowing other methods to be called on top of
         the add method. It is recommended to only call this method at the root of
-        the tree, although, the option isn't closed off (for recursion purposes).
+        the tree, although, the option isn't closed off (for working on subtrees).
         Beware that if add is called on a child, bigger tree may not be sorted.
     remove(item, *args): Removes an item from the tree; rebalances if the tree
         is set to self balance. You can provide any amount of items, separated
@@ -50,27 +81,99 @@ BST Class:
         be removed, only if found. If an item given is not found within the tree,
         it is ignored. Returns self, allowing other methods to be called
         on top of the remove method.
+    add_many(items), remove_many(items): Adds or removes every item of an iterable,
+        which can also be another BST (remove_many treats a BST as a collection of
+        items, not a subtree). If the tree is self balancing and the batch is large
+        compared to the tree, the batch is merged in sorted order and the tree is
+        rebuilt balanced once, instead of rebalancing after each item. add and
+        remove use these when given more than one item. Returns self.
+    union(other), intersection(other), difference(other),
+    symmetric_difference(other): Returns a new tree from the items of both trees,
+        the same as the set methods of the same names. The other can be a BST or
+        any iterable of items. Both trees are walked in order and merged, and
+        the result is built balanced, so this takes O(n + m). The new tree takes
+        the self balancing setting of the tree the method was called on. The
+        operators |, &, - and ^ do the same between two trees.
+    split(key): Splits the tree into a tuple of two trees, the first with the items
+        smaller than key, the second with the rest. The nodes of the tree are
+        reused, leaving the tree empty. Runs in O(log n) on an AVL tree.
+    join(left, right): Static method that joins two trees, where every item of
+        left is smaller than every item of right, and returns the joined tree.
+        A ValueError is raised otherwise. Both trees are used to build the new
+        one, so only the returned tree should be used afterwards. Runs in
+        O(log n) on AVL trees.
     find(item): Searches the tree for the given item. Returns the node if found.
         If it is not found, a ValueError is raised.
-    inorder(): Returns a list with each item in increasing order.
+    contains_many(items): Checks many items for membership at once, returning a
+        list of bools in the same order as the items. Items that are not found
+        do not raise an error. If NumPy is installed and a NumPy array is given,
+        the search is vectorized over a sorted snapshot of the tree and a NumPy
+        bool array is returned.
+    find_many(items): Works like contains_many, but returns the items that were
+        found instead, in the same order. A NumPy array gives a NumPy array.
+    min(), max(): Returns the smallest or largest item in the tree. If the tree
+        is empty, a ValueError is raised.
+    successor(item), predecessor(item): Returns the closest item in the tree that
+        is greater or smaller than the given item. floor(item) and ceiling(item)
+        do the same, but also allow an item equal to the given item. The item
+        does not need to be in the tree. If there is no such item, a ValueError
+        is raised. Each of these follows a single path down the tree.
+    rank(item): Returns the amount of items in the tree smaller than the given
+        item as an int. The item does not need to be in the tree.
+    select(index): Returns the item at the given index in increasing order, the
+        same as inorder()[index] without building the list. Negative indexes
+        count from the end. An IndexError is raised if the index is out of range.
+    range(low = None, high = None, inclusive = True): Yields each item between
+        low and high in increasing order, skipping any subtree outside of the
+        bounds. Either bound can be None to leave that side open. The arg
+        "inclusive" can be a bool for both bounds, or a tuple of two bools to
+        set the low and high bound separately, such as (True, False).
+    count_range(low = None, high = None, inclusive = True): Returns the amount of
+        items between low and high as an int, taking the same args as range.
+        Runs in O(log n) on a self balancing tree.
+    iter_inorder(), iter_preorder(), iter_postorder(): Generator versions of the
+        traversals below. Items are produced one at a time without building a
+        list or recursing, so they can be used on trees of any height and stopped
+        early. The tree should not be changed while iterating.
+    inorder(): Returns a list with each item in increasing order. An empty tree
+        gives an empty list, the same goes for preorder and postorder.
     preorder(): Returns a list with each item in order from the top down, meaning
         the list starts with the root first, then the left branch and its children,
         and ends with the right branch and its children.
     postorder(): Returns a list with each item in order from the ground up, meaning
         the list progressively builds subtrees from left to right to eventually
         form the full tree.
+    enable_stats(stats = None): Starts counting the work the tree does in a
+        TreeStats object (see below) and returns it. An existing TreeStats can be
+        given to share it between trees. Like set_balancing, this takes O(n) and
+        can only be called on the root. When stats are not enabled, the counting
+        costs one check before the search and one after the retrace of each
+        operation, plus one per red black rotation. The retrace keeps its counts
+        in local variables at each node it visits and only adds them at the end.
+    disable_stats(): Stops counting. stats() returns the TreeStats of the tree,
+        or None if stats are not enabled. A deep copy starts without stats, while
+        trees made by split keep the stats of the tree they came from.
     set_balancing(balancing = True): Sets the tree to be self balancing if the given
         arg is True (defaults to True if no args are given). It then balances the tree
         automatically. If the given arg is False, balancing is turned off, and the
-        tree remains untouched. Subtrees/children cannot change the self balancing
-        feature.
+        tree remains untouched. A strategy name can be given instead, the same as
+        for a new tree; "red_black" colors the tree, and rebuilds it only if its
+        shape cannot be colored, and "weight_balanced" rebuilds it only if it is
+        out of balance. Subtrees/children cannot change the self balancing
+        feature. This takes O(n), since the setting is stored on every node.
     is_balanced(): Returns True if the whole tree is balanced, False otherwise.
     balance(): Balances the tree, only allowing for the left and right branches to
-        differ by 0 or 1.
+        differ by 0 or 1. The tree is rebuilt from its items in order, so this
+        takes O(n). A self balancing tree does not need this after add and
+        remove, since those only rebalance the path from the changed node up to
+        the root.
     print_tree(keep_whitespace = False,
                dot = False,
                in_file = False,
-               file_name = "bst.txt"): Prints a representation of the tree. Method
+               file_name = "bst.txt",
+               stream = None,
+               max_depth = None,
+               max_width = None): Prints a representation of the tree. Method
         was made with the intent of keeping the width to a minimum. Each node may
         not line up to other nodes on the same level.
         The arg "keep_whitespace" gives the choice to keep the whitespace at the
@@ -86,16 +189,172 @@ BST Class:
             the tree representation will go, defaulted to "bst.txt". The name must
             be of type str. Useful for if you are printing multiple representations
             into different files.
+        The arg "stream" gives the choice to write the representation to any
+            object with a write method, such as an open text file or a StringIO,
+            defaulted to None. When given, in_file and file_name are ignored.
+        The arg "max_depth" gives the choice to only draw the tree down to a
+            number of levels below the top node, defaulted to None. Nodes past
+            that depth are each drawn as (...).
+        The arg "max_width" gives the choice to cut every line to a number of
+            characters, defaulted to None. Together with max_depth, this lets
+            a huge tree be previewed cheaply.
+        Lines are built one row at a time and written in chunks as they are
+            made, so the whole representation is never held in memory.
         If the print_tree method is called on a subtree, this will be displayed at
         the start by connecting a branch from the subrees root to the parent node,
         with the branch pointed in the direction the subtree is relative to the
         parent node. The parent node will be denoted as (...). This method works
-        for trees of any size.
+        for trees of any size. Where each label and branch goes is worked out in
+        a single pass over the tree, so the cost is about the size of the
+        drawing itself.
+    save(file_name, preorder = False): Writes the tree to a binary file, with a
+        header for the type of the items and the self balancing setting. All
+        items must be of the same type: int, float, str or bytes, and ints must
+        fit in 8 bytes; otherwise a TypeError is raised. Items are written in
+        increasing order, or in preorder if the arg "preorder" is True, which
+        keeps the exact shape of the tree. The file is only replaced once it is
+        written in full, so a failed save leaves an older file untouched.
+    load(file_name): Class method that reads a tree written by save in O(n),
+        without rebalancing. A tree saved in increasing order comes back
+        perfectly balanced, and one saved in preorder comes back with the same
+        shape.
+    iter_load(file_name): Static method that yields the items of a saved file in
+        the order they were saved, without building a tree. Only a chunk of the
+        file is in memory at a time, so it works on files larger than memory.
     copy(): Returns a shallow copy of the tree/subtree.
     deepcopy(): Returns a deep copy of the tree/subtree. If the method is used on
         a subtree, the deep copy will be its own tree without a parent.
+
+    Searching, adding, removing, copying and checking balance use loops instead
+    of recursion, so a tree of any height works, even one built from sorted
+    items without self balancing.
+
+    Nodes use __slots__ to keep memory low on large trees. Settings that apply to
+    the whole tree, such as self balancing, are kept in one object shared by every
+    node of the tree instead of being copied into each node. Only the red black
+    color is kept on each node.
+
+    Rebalancing relinks the existing nodes, so a node returned by find keeps its
+    item while the tree changes around it. The root is the only node that swaps
+    items with a child when rotated, since it is the tree itself and must stay
+    on top. Removing an item with two children also moves the next item into
+    its node.
+
+    A BST can be iterated over directly, which goes through the items in increasing
+    order, and reversed(tree) goes through them in decreasing order. "item in tree"
+    searches the tree the same way as find.
+
+TreeStats Class:
+
+    Description:
+
+    Counters filled in by a tree with stats enabled, useful for finding out why
+    some operations are slow, such as keys arriving in an order that keeps
+    rotating the tree. Counters can be read at any time, and the same TreeStats
+    can be shared by several trees.
+
+    Attributes:
+
+    searches = amount of searches made by find and add
+    comparisons = comparisons made by those searches on the way down, 1 to go
+        left and 2 to go right or to stop at the item. These are counted by a
+        separate walk down the tree before the real one, so with stats enabled
+        every add and find walks the path twice and costs about twice the
+        comparisons it reports
+    single_rotations, double_rotations = rotations made while rebalancing
+    height_updates = nodes whose height was fixed on the way back up after a
+        change
+    rebuilds = times the tree was rebuilt balanced, by balance or a large batch
+    balances = calls of balance, and balance_time = seconds spent in them
+
+    Methods:
+
+    reset(): Sets every counter back to 0.
+    as_dict(): Returns the counters in a dict.
 '''
 
+import os
+import struct
+import sys
+import tempfile
+import time
+from array import array
+from bisect import bisect_left
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+# header of a saved tree: magic, version, key type, order, balancing, count
+_FILE_MAGIC = b"BSTF"
+_FILE_VERSION = 1
+_FILE_HEADER = struct.Struct("<4sBccB8xQ")
+_FILE_KEY_TYPES = {int: b"q", float: b"d", str: b"s", bytes: b"b"}
+_FILE_CHUNK = 65536
+
+# self balancing strategies, stored in a saved tree by their index. False and
+# True are the same as "none" and "avl"
+_BALANCING_MODES = ("none", "avl", "red_black", "weight_balanced")
+
+# weight balance limits (delta and gamma) for the weight balanced strategy
+_WEIGHT_DELTA = 3
+_WEIGHT_GAMMA = 2
+
+
+class TreeStats:
+    '''Counters of the work done by a tree while stats are enabled with
+    BST.enable_stats
+    '''
+
+    __slots__ = ("searches", "comparisons", "single_rotations", "double_rotations",
+                 "height_updates", "rebuilds", "balances", "balance_time")
+
+
+    def __init__(self):
+        self.reset()
+
+
+    def reset(self):
+        '''Sets every counter back to 0'''
+
+        self.searches = 0
+        self.comparisons = 0
+        self.single_rotations = 0
+        self.double_rotations = 0
+        self.height_updates = 0
+        self.rebuilds = 0
+        self.balances = 0
+        self.balance_time = 0.0
+
+
+    def as_dict(self):
+        '''Returns the counters in a dict'''
+
+        return {name: getattr(self, name) for name in TreeStats.__slots__}
+
+
+    def __repr__(self):
+        counters = ", ".join(f"{name}={value!r}" for name, value in self.as_dict().items())
+        return f"TreeStats({counters})"
+
+
+class _TreeConfig:
+    '''Settings shared by every node of a tree. A config is never changed
+    once made; changing a setting gives every node a new config instead. That
+    way trees split from one another can keep sharing the same config. The
+    balancing is one of _BALANCING_MODES, and the stats are None unless they
+    were enabled
+    '''
+
+    __slots__ = ("balancing", "stats")
+
+
+    def __init__(self, balancing, stats = None):
+        self.balancing = balancing
+        self.stats = stats
+
 
 class BST:
     '''Binary Search Tree Class:
@@ -107,26 +366,62 @@ class BST:
         self.right
 
     Methods:
+        from_sorted(items, balancing = False)
+        from_iterable(items, balancing = False)
         size()
         is_empty()
         height()
         add(item, *args)
         remove(item, *args)
+        add_many(items)
+        remove_many(items)
+        union(other)
+        intersection(other)
+        difference(other)
+        symmetric_difference(other)
+        split(key)
+        join(left, right)
         find(item)
+        contains_many(items)
+        find_many(items)
+        min()
+        max()
+        successor(item)
+        predecessor(item)
+        floor(item)
+        ceiling(item)
+        rank(item)
+        select(index)
+        range(low = None, high = None, inclusive = True)
+        count_range(low = None, high = None, inclusive = True)
+        iter_inorder()
+        iter_preorder()
+        iter_postorder()
         inorder()
         preorder()
         postorder()
+        enable_stats(stats = None)
+        disable_stats()
+        stats()
         set_balancing(balancing = True)
         is_balanced()
         balance()
         print_tree(keep_whitespace = False,
                    dot = False,
                    in_file = False,
-                   file_name = "bst.txt")
+                   file_name = "bst.txt",
+                   stream = None,
+                   max_depth = None,
+                   max_width = None)
         copy()
         deepcopy()
+        save(file_name, preorder = False)
+        load(file_name)
+        iter_load(file_name)
     '''
 
+    __slots__ = ("node", "parent", "left", "right", "_config", "_height", "_size", "_red")
+
 
     def __init__(self, item = None, balancing = False):
         '''BST object can be instantiated with 1 item or no items. Balancing
@@ -140,31 +435,107 @@ class BST:
         self.left = None
         self.right = None
 
-        if isinstance(balancing, bool):
-            self._self_balancing = balancing
-        else:
-            raise TypeError("balancing can only be type bool")
+        self._config = _TreeConfig(BST._parse_balancing(balancing, "balancing can only be type bool or str"))
 
         self._height = 0
+        self._red = False
+
+        if item is None:
+            self._size = 0
+        else:
+            self._size = 1
+
+
+    def _new_node(self, item):
+        '''Returns a new node holding the item that shares the settings of
+        this tree
+        '''
+
+        node = BST.__new__(BST)
+
+        node.node = item
+        node.parent = None
+        node.left = None
+        node.right = None
+        node._config = self._config
+        node._height = 0
+        node._size = 1
+        node._red = True
+
+        return node
+
+
+    @classmethod
+    def from_sorted(cls, items, balancing = False):
+        '''Builds a perfectly balanced tree from items that are already in
+        increasing order in O(n). Repeated items are only added once. If the
+        items are not in order, a ValueError is raised
+        '''
+
+        values = []
+        for item in items:
+            if len(values) > 0:
+                if item < values[-1]:
+                    raise ValueError("items must be in increasing order")
+                if item == values[-1]:
+                    continue
+            values.append(item)
+
+        tree = cls(None, balancing)
+        if len(values) > 0:
+            tree._fill_sorted(iter(values), len(values))
+            if tree._config.balancing == "red_black":
+                tree._restore_red_black()
+
+        return tree
+
+
+    @classmethod
+    def from_iterable(cls, items, balancing = False):
+        '''Builds a perfectly balanced tree from items in any order. The items
+        are sorted first, so this costs O(n log n)
+        '''
+
+        return cls.from_sorted(sorted(items), balancing)
+
+
+    def _fill_sorted(self, items, count):
+        '''Fills an empty node with a perfectly balanced subtree of the next
+        count items of a sorted iterator. The left subtree is built first, so
+        the items are used in order and never need to be held in a list.
+        Heights are set on the way back up, so no rebalancing is needed
+        '''
+
+        left_count = (count - 1) // 2
+        right_count = count - 1 - left_count
+
+        if left_count > 0:
+            self.left = self._new_node(None)
+            self.left.parent = self
+            self.left._fill_sorted(items, left_count)
+
+        self.node = next(items)
+
+        if right_count > 0:
+            self.right = self._new_node(None)
+            self.right.parent = self
+            self.right._fill_sorted(items, right_count)
+
+        self._fix_height()
 
 
     def size(self):
-        '''Returns the amount of nodes in the tree'''
+        '''Returns the amount of nodes in the tree. Each node keeps the size
+        of its subtree up to date, so this is O(1)
+        '''
 
-        if self.node is None:
-            return 0
+        return self._size
 
-        if self.left is None:
-            left = 0
-        else:
-            left = self.left.size()
 
-        if self.right is None:
-            right = 0
-        else:
-            right = self.right.size()
+    def __len__(self):
+        '''Returns the amount of nodes in the tree'''
 
-        return 1 + left + right
+        return self._size
 
 
     def is_empty(self):
@@ -179,12 +550,20 @@ class BST:
         return self._height
 
 
-    def _update_height(self):
-        '''Updates the height of the nodes tree, along with its parent,
-        if there is one
+    def _fix_height(self):
+        '''Recomputes the height and subtree size of the node from its
+        children. The parent is left untouched
         '''
 
-        # update self
+        size = 1
+        if self.node is None:
+            size = 0
+        if self.left is not None:
+            size += self.left._size
+        if self.right is not None:
+            size += self.right._size
+        self._size = size
+
         if (self.left is not None) and (self.right is None):
             self._height = self.left._height + 1
 
@@ -201,16 +580,85 @@ class BST:
             else:
                 self._height = self.right._height + 1
 
-        # update parent
-        if self.parent is not None:
 
-            if self.parent._height == 0:
-                self.parent._height = 1
+    def _retrace(self, balancing):
+        '''Walks from the node up to the root of the whole tree, fixing the
+        height and size of each node on the way. If balancing is "avl" or
+        "weight_balanced", any node found to be out of balance is rotated back
+        into balance. Red black trees are fixed by color before this is called,
+        so only heights and sizes are fixed for them. Only the path to the root
+        is visited, so this costs O(log n) on a balanced tree. The work is
+        counted in locals and added to the stats once at the end
+        '''
+
+        stats = self._config.stats
+        single = double = updates = 0
+
+        node = self
+        while node is not None:
+            node._fix_height()
+            updates += 1
+
+            if balancing == "avl":
+                node_fact = node._find_bal_factor()
+
+                if node_fact > 1:
+                    if node.left._find_bal_factor() < 0:
+                        node.left._rotate_left()
+                        double += 1
+                    else:
+                        single += 1
+                    node = node._rotate_right()
+
+                elif node_fact < -1:
+                    if node.right._find_bal_factor() > 0:
+                        node.right._rotate_right()
+                        double += 1
+                    else:
+                        single += 1
+                    node = node._rotate_left()
+
+            elif balancing == "weight_balanced":
+                left_weight = node._child_weight(True)
+                right_weight = node._child_weight(False)
+
+                if right_weight > _WEIGHT_DELTA * left_weight:
+                    if node.right._child_weight(True) >= _WEIGHT_GAMMA * node.right._child_weight(False):
+                        node.right._rotate_right()
+                        double += 1
+                    else:
+                        single += 1
+                    node = node._rotate_left()
+
+                elif left_weight > _WEIGHT_DELTA * right_weight:
+                    if node.left._child_weight(False) >= _WEIGHT_GAMMA * node.left._child_weight(True):
+                        node.left._rotate_left()
+                        double += 1
+                    else:
+                        single += 1
+                    node = node._rotate_right()
+
+            # continue from the node now on top of the rotated subtree
+            node = node.parent
+
+        if stats is not None:
+            stats.single_rotations += single
+            stats.double_rotations += double
+            stats.height_updates += updates
 
-            elif self.parent._height <= self._height:
-                self.parent._height = self._height + 1
 
-            self.parent._update_height()
+    def _child_weight(self, left):
+        '''Returns the weight of the left or right child, which is its size
+        plus 1, so a missing child weighs 1
+        '''
+
+        if left:
+            child = self.left
+        else:
+            child = self.right
+        if child is None:
+            return 1
+        return child._size + 1
 
 
     def add(self, item, *args):
@@ -220,662 +668,2051 @@ class BST:
         the tree will then rebalance. Returns self
         '''
 
-        if isinstance(item, BST):
-            preord = item.preorder()
-            for value in preord:
-                self.add(value)
+        if (len(args) == 0) and not isinstance(item, BST):
+            if self._config.stats is not None:
+                self._count_search(item, self._config.stats)
+            self._insert(item, self._config.balancing)
+            return self
 
-        else:
+        # runs of plain items are added as one batch
+        batch = []
+        for value in (item,) + args:
+            if isinstance(value, BST):
+                if len(batch) > 0:
+                    self.add_many(batch)
+                    batch = []
+                self.add_many(value)
+            else:
+                batch.append(value)
 
-            if self.is_empty():
-                self.node = item
-                return self
+        if len(batch) > 0:
+            self.add_many(batch)
 
-            if item < self.node:
-                if self.left is None:
-                    self.left = BST(item, self._self_balancing)
-                    self.left.parent = self
-                    self.left._update_height()
-                else:
-                    self.left.add(item)
+        return self
 
-            elif item > self.node:
-                if self.right is None:
-                    self.right = BST(item, self._self_balancing)
-                    self.right.parent = self
-                    self.right._update_height()
-                else:
-                    self.right.add(item)
 
-        if self._self_balancing:
-            self.balance()
+    def add_many(self, items):
+        '''Adds every item of an iterable to the tree, which can also be another
+        BST. If self balancing is enabled and the batch is large compared to the
+        tree, the items are sorted and merged with the tree, and the tree is
+        rebuilt balanced once at the end. Otherwise each item is added on its
+        own, which only rebalances the path it was added on. Returns self
+        '''
+
+        balancing = self._config.balancing
 
-        if len(args) > 0:
-            for arg in args:
-                self.add(arg)
+        if not isinstance(items, (list, tuple, BST)):
+            items = list(items)
+
+        if (balancing != "none") and (len(items) * (self._height + 1) >= self._size):
+            if isinstance(items, BST):
+                new_items = items.iter_inorder()
+            else:
+                new_items = sorted(items)
+
+            self._rebuild(list(BST._merge(self.iter_inorder(), new_items, True, True, True)))
+
+        else:
+            # preorder keeps the shape of another tree when not balancing
+            if isinstance(items, BST):
+                items = items.iter_preorder()
+
+            stats = self._config.stats
+            for item in items:
+                if stats is not None:
+                    self._count_search(item, stats)
+                self._insert(item, balancing)
 
         return self
 
 
+    def _insert(self, item, balancing):
+        '''Inserts a single item below the node. Only the path from the new
+        leaf up to the root is retraced, rebalancing it for the given balancing.
+        A red black tree fixes the colors above the new leaf first
+        '''
+
+        if self.is_empty():
+            self.node = item
+            self._size = 1
+            self._red = False
+            return
+
+        node = self
+        while True:
+            if item < node.node:
+                if node.left is None:
+                    node.left = node._new_node(item)
+                    node.left.parent = node
+                    break
+                node = node.left
+
+            elif item > node.node:
+                if node.right is None:
+                    node.right = node._new_node(item)
+                    node.right.parent = node
+                    break
+                node = node.right
+
+            else:
+                return
+
+        if balancing == "red_black":
+            if item < node.node:
+                node = node.left
+            else:
+                node = node.right
+
+            # the leaf may be moved by the rotations, so retrace from it
+            node._fix_red_black_insert()
+
+        node._retrace(balancing)
+
+
+    def _fix_red_black_insert(self):
+        '''Fixes the colors above a new red leaf. While the parent and its
+        sibling are both red, they are made black and the colors move up the
+        tree. Otherwise one or two rotations end it, so an add rotates at most
+        twice. Heights and sizes are left to the retrace afterwards
+        '''
+
+        stats = self._config.stats
+
+        node = self
+        par = node.parent
+        while (par is not None) and par._red:
+            # a red node is never the root, so the grandparent exists
+            grand = par.parent
+            if grand.left is par:
+                uncle = grand.right
+            else:
+                uncle = grand.left
+
+            if (uncle is not None) and uncle._red:
+                par._red = False
+                uncle._red = False
+                grand._red = True
+                node = grand
+                par = node.parent
+                continue
+
+            double = False
+            if grand.left is par:
+                if par.right is node:
+                    par._rotate_left()
+                    double = True
+                top = grand._rotate_right()
+                top.right._red = True
+            else:
+                if par.left is node:
+                    par._rotate_right()
+                    double = True
+                top = grand._rotate_left()
+                top.left._red = True
+            top._red = False
+
+            if stats is not None:
+                if double:
+                    stats.double_rotations += 1
+                else:
+                    stats.single_rotations += 1
+            return
+
+        if par is None:
+            node._red = False
+
+
     def remove(self, item, *args):
         '''Removes an item from the tree. Any amount of items can be removed at
         once, separated by a comma. If a BST is given as an arg, the root and
-        its children/subtrees will also be removed. If the item is not found
+        its children/subtrees will also be removed, after which a self balancing
+        tree is checked and rebuilt if needed in O(n). If the item is not found
         in the tree, it is ignored. If self balancing is enabled, the tree will
         then rebalance. Returns self
         '''
 
-        if isinstance(item, BST):
+        balancing = self._config.balancing
 
-            if item.parent.left is item:
-                item.parent.left = None
-            else:
-                item.parent.right = None
+        if len(args) > 0:
 
-            item.parent._update_height()
-            if self._self_balancing:
-                self.balance()
+            # runs of plain items are removed as one batch
+            batch = []
+            for value in (item,) + args:
+                if isinstance(value, BST):
+                    if len(batch) > 0:
+                        self.remove_many(batch)
+                        batch = []
+                    self.remove(value)
+                else:
+                    batch.append(value)
 
-            del item
+            if len(batch) > 0:
+                self.remove_many(batch)
 
-        else:
+        elif isinstance(item, BST):
 
-            try:
-                node = self.find(item)
-                par = node.parent
-                side = 0
+            par = item.parent
+            if par.left is item:
+                par.left = None
+            else:
+                par.right = None
+            item.parent = None
 
-                if (par is not None) and (par.left is node):
-                    side = -1
-                elif (par is not None) and (par.right is node):
-                    side = 1
+            par._retrace(balancing)
 
-                if (node.left is None) and (node.right is None):
+            # a retrace only makes up for a height change of 1, so after losing
+            # a whole subtree the tree is checked and rebuilt if still needed
+            top = par
+            while top.parent is not None:
+                top = top.parent
 
-                    if side < 0:
-                        par.left = None
-                    elif side > 0:
-                        par.right = None
+            if balancing == "avl":
+                top.balance()
+            elif balancing == "red_black":
+                # cutting off a subtree leaves the black heights uneven
+                top._restore_red_black()
+            elif (balancing == "weight_balanced") and not top._is_weight_balanced():
+                top._rebuild(top.inorder())
 
-                    if side != 0:
-                        par._update_height()
-                        del node
-                    else:
-                        node.node = None
+        else:
 
-                elif (node.left is not None) and (node.right is None):
+            node = self._search(item)
+            if node is not None:
+                node._delete(balancing)
 
-                    if side < 0:
-                        par.left = node.left
-                        node.left.parent = par
-                    elif side > 0:
-                        par.right = node.left
-                        node.left.parent = par
+        return self
 
-                    if side != 0:
-                        par._update_height()
-                        del node
-                    else:
-                        replacement = node.left
-                        node._height = replacement._height
-                        node.left = replacement.left
-                        node.right = replacement.right
-                        node.node = replacement.node
-                        del replacement
-
-                elif (node.right is not None) and (node.left is None):
-
-                    if side < 0:
-                        par.left = node.right
-                        node.right.parent = par
-                    elif side > 0:
-                        par.right = node.right
-                        node.right.parent = par
-
-                    if side != 0:
-                        par._update_height()
-                        del node
-                    else:
-                        replacement = node.right
-                        node._height = replacement._height
-                        node.left = replacement.left
-                        node.right = replacement.right
-                        node.node = replacement.node
-                        del replacement
 
-                else:
-                    inorder_list = node.inorder()
+    def remove_many(self, items):
+        '''Removes every item of an iterable from the tree, ignoring items that
+        are not found. A BST given here is treated as a collection of items,
+        not as a subtree to cut off. If self balancing is enabled and the batch
+        is large compared to the tree, the tree is rebuilt once without the
+        items instead of removing them one at a time. Returns self
+        '''
 
-                    # find index of successor
-                    if node.left._height >= node.right._height:
-                        index = inorder_list.index(node.node) - 1
-                    else:
-                        index = inorder_list.index(node.node) + 1
+        balancing = self._config.balancing
 
-                    successor = node.find(inorder_list[index])
-                    node.remove(successor.node)
-                    node.node = successor.node
-                    node._update_height()
+        if not isinstance(items, (list, tuple, BST)):
+            items = list(items)
 
-                    del successor
+        if (balancing != "none") and (len(items) * (self._height + 1) >= self._size):
+            if isinstance(items, BST):
+                old_items = items.iter_inorder()
+            else:
+                old_items = sorted(items)
 
-            except:
-                pass
+            self._rebuild(list(BST._merge(self.iter_inorder(), old_items, True, False, False)))
 
-        if self._self_balancing:
-            self.balance()
+        else:
+            # the items of a BST are read first, since it may be this tree or
+            # a part of it, which the removals below change
+            if isinstance(items, BST):
+                items = items.inorder()
 
-        if len(args) > 0:
-            for arg in args:
-                self.remove(arg)
+            for item in items:
+                node = self._search(item)
+                if node is not None:
+                    node._delete(balancing)
 
         return self
 
 
-    def find(self, item):
-        '''Searches for an item in the tree, returning the BST object that item
-        occupies. If it is not found, a ValueError is raised
+    def union(self, other):
+        '''Returns a new tree with the items found in either tree. other can be
+        a BST or any iterable of items
         '''
 
-        if self.node is None:
-            raise ValueError("Tree is empty")
+        return self._combine(other, True, True, True)
 
-        if item == self.node:
-            return self
 
-        if (item < self.node) and (self.left is not None):
-            return self.left.find(item)
+    def intersection(self, other):
+        '''Returns a new tree with the items found in both trees'''
 
-        if (item > self.node) and (self.right is not None):
-            return self.right.find(item)
+        return self._combine(other, False, True, False)
 
-        raise ValueError("Item not found in tree")
 
+    def difference(self, other):
+        '''Returns a new tree with the items of this tree that are not in
+        the other
+        '''
 
-    def inorder(self):
-        '''Returns a list of the tree in order of inorder traversal'''
+        return self._combine(other, True, False, False)
 
-        inorder_list = []
 
-        left_list = []
-        if self.left is not None:
-            left_list = self.left.inorder()
+    def symmetric_difference(self, other):
+        '''Returns a new tree with the items found in exactly one of the
+        trees
+        '''
 
-        right_list = []
-        if self.right is not None:
-            right_list = self.right.inorder()
+        return self._combine(other, True, False, True)
 
-        inorder_list.extend(left_list)
-        inorder_list.append(self.node)
-        inorder_list.extend(right_list)
 
-        return inorder_list
+    def _combine(self, other, keep_first, keep_both, keep_second):
+        '''Merges the items of both trees in order and builds a new balanced
+        tree from the result, which takes O(n + m). A non BST other is sorted
+        first. The new tree takes the self balancing setting of this tree
+        '''
 
+        if isinstance(other, BST):
+            other_items = other.iter_inorder()
+        else:
+            other_items = sorted(other)
 
-    def preorder(self):
-        '''Returns a list of the tree in order of preorder traversal'''
+        merged = BST._merge(self.iter_inorder(), other_items, keep_first, keep_both, keep_second)
 
-        preorder_list = [self.node]
+        return BST.from_sorted(merged, self._config.balancing)
 
-        left_list = []
-        if self.left is not None:
-            left_list = self.left.preorder()
 
-        right_list = []
-        if self.right is not None:
-            right_list = self.right.preorder()
+    def __or__(self, other):
+        '''Returns the union of two trees'''
 
-        preorder_list.extend(left_list)
-        preorder_list.extend(right_list)
+        if not isinstance(other, BST):
+            return NotImplemented
+        return self.union(other)
 
-        return preorder_list
 
+    def __and__(self, other):
+        '''Returns the intersection of two trees'''
 
-    def postorder(self):
-        '''Returns a list of the tree in order of postorder traversal'''
+        if not isinstance(other, BST):
+            return NotImplemented
+        return self.intersection(other)
 
-        postorder_list = []
 
-        left_list = []
-        if self.left is not None:
-            left_list = self.left.postorder()
+    def __sub__(self, other):
+        '''Returns the difference of two trees'''
 
-        right_list = []
-        if self.right is not None:
-            right_list = self.right.postorder()
+        if not isinstance(other, BST):
+            return NotImplemented
+        return self.difference(other)
 
-        postorder_list.extend(left_list)
-        postorder_list.extend(right_list)
-        postorder_list.append(self.node)
 
-        return postorder_list
+    def __xor__(self, other):
+        '''Returns the symmetric difference of two trees'''
 
+        if not isinstance(other, BST):
+            return NotImplemented
+        return self.symmetric_difference(other)
 
-    def set_balancing(self, balancing = True):
-        '''Sets the self balancing feature to True or False. Only roots of trees
-        can change the trees self balancing feature
+
+    def split(self, key):
+        '''Splits the tree into two trees, returned as a tuple. The first has
+        the items smaller than key, and the second has the rest. The nodes of
+        this tree are reused to build them, so this tree is left empty. Runs in
+        O(log n) on an AVL tree. Red black and weight balanced trees rebuild
+        both halves instead, which takes O(n)
         '''
 
-        if isinstance(balancing, bool):
-            if self.parent is None:
-                self._self_balancing = balancing
-                if balancing:
-                    self.balance()
+        if self.parent is not None:
+            raise AttributeError("Tree is a subtree of another tree; cannot split")
+
+        balancing = self._config.balancing
+
+        if self.node is None:
+            return (BST(None, balancing), BST(None, balancing))
+
+        if balancing in ("red_black", "weight_balanced"):
+            # these cannot be joined by height, so both halves are rebuilt
+            values = self.inorder()
+            index = bisect_left(values, key)
+
+            smaller = self._new_node(None)
+            smaller._rebuild(values[:index])
+            larger = self._new_node(None)
+            larger._rebuild(values[index:])
+
+            self._rebuild([])
+            return (smaller, larger)
+
+        # compare key down the whole search path before changing any links, so
+        # a key that cannot be compared to the items leaves the tree as it was
+        directions = []
+        node = self
+        while node is not None:
+            directions.append(key <= node.node)
+            if directions[-1]:
+                node = node.left
             else:
-                raise AttributeError("Tree is a subtree of another tree; cannot change balancing")
-        else:
-            raise TypeError("set_balancing only takes type bool")
+                node = node.right
+
+        # move the root into a new node so self can be left empty
+        root = self._new_node(self.node)
+        root.left = self.left
+        root.right = self.right
+        if root.left is not None:
+            root.left.parent = root
+        if root.right is not None:
+            root.right.parent = root
+
+        self.node = None
+        self.left = None
+        self.right = None
+        self._height = 0
+        self._size = 0
 
+        smaller, larger = BST._split_node(root, directions, balancing)
 
-    def _find_bal_factor(self):
-        '''Returns the height of the left side minus the height
-        of the right side
+        if smaller is None:
+            smaller = BST(None, balancing)
+        if larger is None:
+            larger = BST(None, balancing)
+
+        return (smaller, larger)
+
+
+    @staticmethod
+    def _split_node(node, directions, balancing):
+        '''Splits the subtree under node along a search path, returning the
+        roots of the two halves (None for an empty half). directions holds
+        whether the key went left at each node of the path. Each node on the
+        path is used as the middle node to join the pieces that fall on its side
         '''
 
-        left_bal = 0
-        if self.left is not None:
-            left_bal = self.left._height + 1
+        # cut every node on the search path off from its children
+        path = []
+        for went_left in directions:
+            left = node.left
+            right = node.right
+            if left is not None:
+                left.parent = None
+            if right is not None:
+                right.parent = None
+
+            path.append((node, left, right, went_left))
+            if went_left:
+                node = left
+            else:
+                node = right
+
+        # join the pieces from the bottom of the path up
+        smaller = None
+        larger = None
+        while len(path) > 0:
+            node, left, right, went_left = path.pop()
+            if went_left:
+                larger = BST._join_nodes(larger, node, right, balancing)
+            else:
+                smaller = BST._join_nodes(left, node, smaller, balancing)
 
-        right_bal = 0
-        if self.right is not None:
-            right_bal = self.right._height + 1
+        return (smaller, larger)
 
-        return left_bal - right_bal
 
+    @staticmethod
+    def join(left, right):
+        '''Joins two trees where every item of left is smaller than every item of
+        right, returning the joined tree. Both trees are used to build it, so
+        only the returned tree should be used afterwards. Runs in O(log n) on
+        AVL trees, while red black and weight balanced trees are rebuilt in
+        O(n + m). If the trees differ in self balancing or in their stats
+        object, the right tree is changed to match the left one first, which
+        takes O(m), and it is rebalanced for the strategy of the left tree if
+        needed. Trees with the same settings are joined without that
+        '''
 
-    def is_balanced(self):
-        '''Returns true if the height of the left side and right side only differ
-        by 0 or 1, along with each subtree contained. Returns false otherwise
+        if not (isinstance(left, BST) and isinstance(right, BST)):
+            raise TypeError("join only takes type BST")
+        if (left.parent is not None) or (right.parent is not None):
+            raise AttributeError("Tree is a subtree of another tree; cannot join")
+
+        if right.node is None:
+            return left
+        if left.node is None:
+            return right
+
+        if not (left.max() < right.min()):
+            raise ValueError("every item of left must be smaller than every item of right")
+
+        # the right tree takes the settings of the left, and is rebalanced
+        # first if it was kept to another strategy. Configs never change once
+        # made, so a right tree with the same settings keeps its own config
+        balancing = left._config.balancing
+        if (right._config.balancing != balancing) or (right._config.stats is not left._config.stats):
+            if right._config.balancing != balancing:
+                right.set_balancing(balancing)
+            right._set_config(left._config)
+
+        if balancing in ("red_black", "weight_balanced"):
+            values = left.inorder()
+            values.extend(right.iter_inorder())
+            right._rebuild([])
+            left._rebuild(values)
+            return left
+
+        # the smallest item of right becomes the middle node
+        middle = right.min()
+        right._search(middle)._delete(right._config.balancing)
+
+        if right.node is None:
+            left._insert(middle, balancing)
+            return left
+
+        return BST._join_nodes(left, left._new_node(middle), right, balancing)
+
+
+    @staticmethod
+    def _join_nodes(left, middle, right, balancing):
+        '''Joins two subtrees (either can be None) using the middle node, which
+        goes between them. The middle node is attached down the side of the
+        taller subtree where the heights match, and the path back up from it is
+        retraced. Returns the root of the joined subtree
         '''
 
-        node_factor = self._find_bal_factor()
-        if (node_factor > 1) or (node_factor < -1):
-            return False
+        left_height = -1
+        if left is not None:
+            left_height = left._height
+        right_height = -1
+        if right is not None:
+            right_height = right._height
+
+        middle.parent = None
+
+        if left_height > right_height + 1:
+            # walk down the right side of left
+            root = left
+            node = left
+            while (node._height > right_height + 1) and (node.right is not None):
+                node = node.right
+
+            par = node.parent
+            if par is None:
+                root = middle
+            else:
+                par.right = middle
+                middle.parent = par
+
+            middle.left = node
+            middle.right = right
+
+        elif right_height > left_height + 1:
+            # walk down the left side of right
+            root = right
+            node = right
+            while (node._height > left_height + 1) and (node.left is not None):
+                node = node.left
+
+            par = node.parent
+            if par is None:
+                root = middle
+            else:
+                par.left = middle
+                middle.parent = par
 
-        left_balanced = True
-        if self.left is not None:
-            left_balanced = self.left.is_balanced()
+            middle.left = left
+            middle.right = node
 
-        right_balanced = True
-        if self.right is not None:
-            right_balanced = self.right.is_balanced()
+        else:
+            root = middle
+            middle.left = left
+            middle.right = right
 
-        if left_balanced and right_balanced:
-            return True
-        return False
+        if middle.left is not None:
+            middle.left.parent = middle
+        if middle.right is not None:
+            middle.right.parent = middle
 
+        middle._retrace(balancing)
 
-    def balance(self):
-        '''Balances a tree using left and right rotations'''
+        return root
 
-        # balance left side
-        if self.left is not None:
-            left_bal = self.left.is_balanced()
-            if left_bal is False:
-                self.left.balance()
 
-        # balance right side
-        if self.right is not None:
-            right_bal = self.right.is_balanced()
-            if right_bal is False:
-                self.right.balance()
+    def _rebuild(self, values):
+        '''Replaces the items of the tree with the given values, which must be
+        sorted with no repeats, as a perfectly balanced tree. The root node
+        keeps its identity, so references to the tree stay valid. A red black
+        tree is colored again afterwards
+        '''
 
-        if self.is_balanced() is False:
-            node_fact = self._find_bal_factor()
+        if self._config.stats is not None:
+            self._config.stats.rebuilds += 1
 
-            if node_fact > 0:
-                child_fact = self.left._find_bal_factor()
-            elif node_fact < 0:
-                child_fact = self.right._find_bal_factor()
+        self.left = None
+        self.right = None
 
-            if (node_fact > 0) and (child_fact > 0):
-                self._rotate_right()
+        if len(values) == 0:
+            self.node = None
+            self._height = 0
+            self._size = 0
+        else:
+            self._fill_sorted(iter(values), len(values))
 
-            elif (node_fact > 0) and (child_fact <= 0):
-                self.left._rotate_left()
-                self._rotate_right()
+        if self.parent is not None:
+            self.parent._retrace(self._config.balancing)
 
-            elif (node_fact < 0) and (child_fact > 0):
-                self.right._rotate_right()
-                self._rotate_left()
+        if self._config.balancing == "red_black":
+            top = self
+            while top.parent is not None:
+                top = top.parent
+            top._restore_red_black()
 
-            elif (node_fact < 0) and (child_fact <= 0):
-                self._rotate_left()
 
-        # verify
-        if self.is_balanced() is False:
-            self.balance()
+    def _restore_red_black(self):
+        '''Colors a whole red black tree whose shape was made without colors,
+        such as by a rebuild or by cutting off a subtree. A shape that cannot
+        be colored is rebuilt balanced, which always can be
+        '''
 
+        if not self._color_red_black():
+            self._rebuild(self.inorder())
 
-    def _rotate_left(self):
-        '''Rotates a tree left at the top node'''
 
-        # references
-        node = BST(self.node, self._self_balancing)
-        right = self.right
-        child = right.left
+    def _color_red_black(self):
+        '''Colors the tree so that the root is black, no red node has a red
+        child, and every path down has the same amount of black nodes. Returns
+        False, leaving the colors alone, if the shape does not allow that. The
+        black heights each subtree can have with a black or a red top are found
+        from the bottom up, then colors are picked from the top down to match.
+        Takes O(n)
+        '''
 
-        # set up new nodes right child
-        node.right = child
-        if child is not None:
-            child.parent = node
+        if self.node is None:
+            return True
 
-        # set up new nodes left child
-        node.left = self.left
-        if self.left is not None:
-            self.left.parent = node
+        # (lowest, highest) black height with a black top and with a red top,
+        # or None if the top cannot be that color. A missing child is black
+        missing = ((0, 0), None)
+        heights = {}
+        for node in self._postorder_nodes():
+            left = missing
+            if node.left is not None:
+                left = heights[id(node.left)]
+            right = missing
+            if node.right is not None:
+                right = heights[id(node.right)]
+
+            # a black top takes children of either color, a red top only black
+            black = BST._range_overlap(BST._range_union(left), BST._range_union(right))
+            if black is not None:
+                black = (black[0] + 1, black[1] + 1)
+            red = BST._range_overlap(left[0], right[0])
+
+            heights[id(node)] = (black, red)
+
+        if heights[id(self)][0] is None:
+            return False
 
-        # connect new node to tree
-        node.parent = self
-        self.left = node
+        stack = [(self, heights[id(self)][0][1], False)]
+        while len(stack) > 0:
+            node, black_height, red = stack.pop()
+            node._red = red
+            if not red:
+                black_height -= 1
+
+            # children of a red node are black, others are black when possible
+            for child in (node.left, node.right):
+                if child is not None:
+                    child_red = False
+                    if not red:
+                        black = heights[id(child)][0]
+                        child_red = (black is None) or not (black[0] <= black_height <= black[1])
+                    stack.append((child, black_height, child_red))
+
+        return True
+
+
+    @staticmethod
+    def _range_overlap(first, second):
+        '''Returns the overlap of two ranges of black heights, or None if
+        either is None or they do not overlap
+        '''
 
-        # replace trees node
-        self.node = right.node
+        if (first is None) or (second is None):
+            return None
 
-        # reset trees right child
-        self.right = right.right
-        right.parent = self
+        low = max(first[0], second[0])
+        high = min(first[1], second[1])
+        if low > high:
+            return None
+        return (low, high)
 
-        del right
 
-        node._update_height()
+    @staticmethod
+    def _range_union(heights):
+        '''Returns every black height a subtree can have with either color on
+        top, given the ranges for a black and a red top. The two ranges always
+        touch, so the result is a single range
+        '''
 
+        black, red = heights
+        if black is None:
+            return red
+        if red is None:
+            return black
+        return (min(black[0], red[0]), max(black[1], red[1]))
 
-    def _rotate_right(self):
-        '''Rotates a tree right at the top node'''
 
-        # references
-        node = BST(self.node, self._self_balancing)
-        left = self.left
-        child = left.right
+    @staticmethod
+    def _merge(first, second, keep_first, keep_both, keep_second):
+        '''Walks two sorted iterables together, yielding items in increasing
+        order with no repeats. The three flags pick whether items found only
+        in the first, in both, or only in the second are kept
+        '''
 
-        # set up new nodes left child
-        node.left = child
-        if child is not None:
-            child.parent = node
+        first = iter(first)
+        second = iter(second)
+
+        end = object()
+        a = next(first, end)
+        b = next(second, end)
+        last = end
+
+        while (a is not end) or (b is not end):
+            if (b is end) or ((a is not end) and (a < b)):
+                item = a
+                keep = keep_first
+                a = next(first, end)
+            elif (a is end) or (b < a):
+                item = b
+                keep = keep_second
+                b = next(second, end)
+            else:
+                item = a
+                keep = keep_both
+                a = next(first, end)
+                b = next(second, end)
 
-        # set up new nodes right child
-        node.right = self.right
-        if self.right is not None:
-            self.right.parent = node
+            # repeats within one side were already decided the first time
+            if (last is not end) and (item == last):
+                continue
+            last = item
 
-        # connect new node to tree
-        node.parent = self
-        self.right = node
+            if keep:
+                yield item
 
-        # replace trees node
-        self.node = left.node
 
-        # reset trees left child
-        self.left = left.left
-        left.parent = self
+    def _delete(self, balancing):
+        '''Unlinks the node from the tree, then retraces the path from where
+        the tree changed up to the root. In a red black tree, a black node that
+        is unlinked has its colors fixed first
+        '''
 
-        del left
+        node = self
+        par = node.parent
+        side = 0
 
-        node._update_height()
+        if (par is not None) and (par.left is node):
+            side = -1
+        elif (par is not None) and (par.right is node):
+            side = 1
 
+        if (node.left is None) and (node.right is None):
 
-    def _tree_to_str_list(self, dot = False):
-        '''Converts a tree to an ASCII visual representation. Returns each line
-        of that representation in a list
-        '''
+            if side < 0:
+                par.left = None
+            elif side > 0:
+                par.right = None
 
-        if dot:
-            node_str = "(.)"
-        else:
-            if str(self.node)[0] == "(":
-                node_str = f"{self.node}"
+            if side != 0:
+                node.parent = None
+                if (balancing == "red_black") and not node._red:
+                    BST._fix_red_black_delete(None, par)
+                par._retrace(balancing)
             else:
-                node_str = f"({self.node}"
-            if str(self.node)[-1] != ")":
-                node_str += ")"
+                node.node = None
+                node._size = 0
 
-            i = 1
-            while i < (len(node_str) - 1):
-                if node_str[i] == "(":
-                    node_str = node_str[:i] + "{" + node_str[i + 1:]
-                elif node_str[i] == ")":
-                    node_str = node_str[:i] + "}" + node_str[i + 1:]
-                i += 1
+        elif (node.left is None) or (node.right is None):
 
-        if (self.left is None) and (self.right is None):
-            return [node_str]
+            if node.left is not None:
+                child = node.left
+            else:
+                child = node.right
 
-        str_list = []
+            if side != 0:
+                if side < 0:
+                    par.left = child
+                else:
+                    par.right = child
+                child.parent = par
+                node.parent = None
+                if (balancing == "red_black") and not node._red:
+                    BST._fix_red_black_delete(child, par)
+                par._retrace(balancing)
 
-        # get left and right lists recursively
-        left_list = []
-        if self.left is not None:
-            left_list = self.left._tree_to_str_list(dot)
-        right_list = []
-        if self.right is not None:
-            right_list = self.right._tree_to_str_list(dot)
-
-        # even out the lists by adding whitespace
-        if len(left_list) > 0:
-            while len(left_list) < len(right_list):
-                left_list.append(len(left_list[0]) * " ")
-        if len(right_list) > 0:
-            while len(left_list) > len(right_list):
-                right_list.append(len(right_list[0]) * " ")
-
-        # delete unneccesary whitespace by merging
-        if (len(left_list) > 0) and (len(right_list) > 0):
-
-            # find index of inner parenthesis on both sides
-            left_paren = -1
-            while left_paren >= (len(left_list[0]) * -1):
-                if left_list[0][left_paren].isspace():
-                    left_paren -= 1
+            else:
+                # the root keeps its identity, so pull the child up into it
+                node.node = child.node
+                node.left = child.left
+                node.right = child.right
+                if node.left is not None:
+                    node.left.parent = node
+                if node.right is not None:
+                    node.right.parent = node
+                node._retrace(balancing)
+
+        else:
+            # take the successor from the taller side
+            if node.left._height >= node.right._height:
+                successor = node.left._max_node()
+            else:
+                successor = node.right._min_node()
+
+            # the successor has at most one child, so it is unlinked directly.
+            # the value is moved first since a rotation at the root swaps items
+            node.node = successor.node
+            successor._delete(balancing)
+
+
+    @staticmethod
+    def _fix_red_black_delete(node, par):
+        '''Fixes the colors after a black node was unlinked from under par,
+        where node (which can be None) took its place. That side is now short
+        of one black node. A red node there is simply made black; otherwise the
+        missing black moves up the tree by recoloring until it can be made up
+        for with at most three rotations, so a remove rotates O(1) times.
+        Heights and sizes are left to the retrace afterwards
+        '''
+
+        stats = par._config.stats
+
+        while (par is not None) and ((node is None) or not node._red):
+            # the short side had a black node, so the other side is not empty
+            if par.left is node:
+                sibling = par.right
+                if sibling._red:
+                    sibling._red = False
+                    par._red = True
+                    par = par._rotate_left().left
+                    sibling = par.right
+                    if stats is not None:
+                        stats.single_rotations += 1
+
+                near_red = (sibling.left is not None) and sibling.left._red
+                far_red = (sibling.right is not None) and sibling.right._red
+                if near_red or far_red:
+                    if not far_red:
+                        sibling.left._red = False
+                        sibling._red = True
+                        sibling = sibling._rotate_right()
+                    sibling._red = par._red
+                    par._red = False
+                    sibling.right._red = False
+                    par._rotate_left()
+
+            else:
+                sibling = par.left
+                if sibling._red:
+                    sibling._red = False
+                    par._red = True
+                    par = par._rotate_right().right
+                    sibling = par.left
+                    if stats is not None:
+                        stats.single_rotations += 1
+
+                near_red = (sibling.right is not None) and sibling.right._red
+                far_red = (sibling.left is not None) and sibling.left._red
+                if near_red or far_red:
+                    if not far_red:
+                        sibling.right._red = False
+                        sibling._red = True
+                        sibling = sibling._rotate_left()
+                    sibling._red = par._red
+                    par._red = False
+                    sibling.left._red = False
+                    par._rotate_right()
+
+            if near_red or far_red:
+                if stats is not None:
+                    if far_red:
+                        stats.single_rotations += 1
+                    else:
+                        stats.double_rotations += 1
+                return
+
+            sibling._red = True
+            node = par
+            par = node.parent
+
+        if node is not None:
+            node._red = False
+
+
+    def find(self, item):
+        '''Searches for an item in the tree, returning the BST object that item
+        occupies. If it is not found, a ValueError is raised
+        '''
+
+        if self.node is None:
+            raise ValueError("Tree is empty")
+
+        if self._config.stats is not None:
+            self._count_search(item, self._config.stats)
+
+        node = self._search(item)
+        if node is None:
+            raise ValueError("Item not found in tree")
+
+        return node
+
+
+    def _count_search(self, item, stats):
+        '''Adds a search for the item to the stats, along with the comparisons
+        made on the way down: 1 to go left, and 2 to go right or to stop at the
+        item. Only called while stats are enabled
+        '''
+
+        comparisons = 0
+        node = self
+        while (node is not None) and (node.node is not None):
+            comparisons += 1
+            if item < node.node:
+                node = node.left
+            else:
+                comparisons += 1
+                if item > node.node:
+                    node = node.right
                 else:
                     break
-            right_paren = 0
-            while right_paren < len(right_list[0]):
-                if right_list[0][right_paren].isspace():
-                    right_paren += 1
+
+        stats.searches += 1
+        stats.comparisons += comparisons
+
+
+    def _search(self, item):
+        '''Returns the node holding the item, or None if it is not in the
+        tree. Unlike find, a miss does not raise
+        '''
+
+        if self.node is None:
+            return None
+
+        node = self
+        while node is not None:
+            if item < node.node:
+                node = node.left
+            elif item > node.node:
+                node = node.right
+            else:
+                return node
+
+        return None
+
+
+    def contains_many(self, items):
+        '''Checks each of the given items for membership at once, returning a
+        list of bools in the same order. If a NumPy array is given, a NumPy
+        bool array is returned instead. Misses never raise
+        '''
+
+        if (numpy is not None) and isinstance(items, numpy.ndarray):
+            keys, positions = self._numpy_positions(items)
+            if len(keys) == 0:
+                return numpy.zeros(items.shape, dtype=bool)
+            return keys[positions] == items
+
+        return [node is not None for node in self._lookup_many(items)]
+
+
+    def find_many(self, items):
+        '''Searches for each of the given items at once, returning a list of the
+        items that were found, in the same order they were given. Items that are
+        not in the tree are left out instead of raising. If a NumPy array is
+        given, a NumPy array is returned instead
+        '''
+
+        if (numpy is not None) and isinstance(items, numpy.ndarray):
+            keys, positions = self._numpy_positions(items)
+            if len(keys) == 0:
+                return keys
+            return keys[positions[keys[positions] == items]]
+
+        return [node for node in self._lookup_many(items) if node is not None]
+
+
+    def _lookup_many(self, items):
+        '''Returns the stored item for each of the given items, or None for
+        each miss. Small batches search the tree once per item. Larger batches
+        take a sorted snapshot of the tree and binary search it instead, which
+        avoids following node references for every item
+        '''
+
+        if not isinstance(items, (list, tuple)):
+            items = list(items)
+
+        found = []
+
+        if len(items) * (self._height + 1) <= self._size:
+            for item in items:
+                node = self._search(item)
+                if node is None:
+                    found.append(None)
                 else:
-                    break
+                    found.append(node.node)
 
-            # find max amount of whitespace that can be removed
-            max_whitespace = right_paren + ((left_paren * -1) - 1) - (len(node_str) - 2)
-            # *max_whitespace_to_be_deleted
-
-            if max_whitespace > 0:
-
-                # make distance even
-                if (max_whitespace % 2) == 1:
-                    index = 0
-                    while index < len(left_list):
-                        left_list[index] += " "
-                        index += 1
-                    max_whitespace += 1
-
-                merge_left = True
-                merge_right = True
-
-                # check if its possible to merge on both left and right sides
-                while (merge_left or merge_right) and (max_whitespace > 0):
-                    line = 0
-                    merge = []  # list of tuples of bools telling if you can merge on left or right
-
-                    while line < len(left_list):
-                        combined = left_list[line] + right_list[line]
-
-                        # potetial line deleting 2 characters from end of left
-                        potent_line_1 = left_list[line][:-2] + right_list[line]
-                        if (len(potent_line_1.replace(" ", "")) != len(combined.replace(" ", ""))) or (len(left_list[line][:-2]) == 0):
-                            merge_left = False
-                        else:
-                            merge_left = True
-
-                        # potetial line deleting 2 characters from start of right
-                        potent_line_2 = left_list[line] + right_list[line][2:]
-                        if len(potent_line_2.replace(" ", "")) != len(combined.replace(" ", "")) or (len(right_list[line][2:]) == 0):
-                            merge_right = False
-                        else:
-                            merge_right = True
-
-                        if (merge_left is False) and (merge_right is False):
-                            merge = []
-                            break
-
-                        merge.append((merge_left, merge_right))
-                        line += 1
-
-                    # remove whitespace
-                    if len(merge) > 0:
-                        index = 0
-                        while index < len(merge):
-                            if merge[index][0]:
-                                left_list[index] = left_list[index][:-2]
-                            elif merge[index][1]:
-                                right_list[index] = right_list[index][2:]
-                            index += 1
-                        max_whitespace -= 2
-
-                if (len(left_list) > 0) and (len(left_list[0]) > 0):
-
-                    if (len(right_list) > 0) and (len(right_list[0]) > 0):
-
-                        index = 0
-                        while index < len(left_list):
-                            if ((left_list[index][-1] ==  ")") or (left_list[index][-1] ==  "\\")) and ((right_list[index][0] == "(") or (right_list[index][0] == "/")):
-                                j = 0
-                                while j < len(left_list):
-                                    left_list[j] += "  "
-                                    j += 1
-                            index += 1  
-
-            elif max_whitespace < 0:
-                max_whitespace *= -1
-                index = 0
-                while index < len(left_list):
-                    left_list[index] += f"{max_whitespace * ' '}"
-                    index += 1
-
-        elif len(left_list) > 0:
-
-            # check if more whitespace is needed for node
-            paren = -1
-            while paren >= (len(left_list[0]) * -1):
-                if left_list[0][paren].isspace():
-                    paren -= 1
+        else:
+            keys = self.inorder()
+            for item in items:
+                index = bisect_left(keys, item)
+                if (index < len(keys)) and (keys[index] == item):
+                    found.append(keys[index])
                 else:
-                    break
+                    found.append(None)
 
-            # add whitespace if needed
-            diff = paren + len(node_str)
-            if diff > 0:
-                index = 0
-                while index < len(left_list):
-                    left_list[index] += f"{diff * ' '}"
-                    index += 1
+        return found
 
-        else:
 
-            # check if more whitespace is needed for node
-            paren = 0
-            while paren < len(right_list[0]):
-                if right_list[0][paren].isspace():
-                    paren += 1
+    def _numpy_positions(self, items):
+        '''Returns a sorted NumPy snapshot of the tree, along with the index in
+        that snapshot where each of the given items would be. Indexes past the
+        end are clipped so they can be used directly
+        '''
+
+        keys = numpy.asarray(self.inorder())
+        if len(keys) == 0:
+            return keys, None
+
+        positions = numpy.searchsorted(keys, items)
+        numpy.minimum(positions, len(keys) - 1, out=positions)
+
+        return keys, positions
+
+
+    def min(self):
+        '''Returns the smallest item in the tree. If the tree is empty, a
+        ValueError is raised
+        '''
+
+        if self.node is None:
+            raise ValueError("Tree is empty")
+
+        return self._min_node().node
+
+
+    def max(self):
+        '''Returns the largest item in the tree. If the tree is empty, a
+        ValueError is raised
+        '''
+
+        if self.node is None:
+            raise ValueError("Tree is empty")
+
+        return self._max_node().node
+
+
+    def _min_node(self):
+        '''Returns the left most node of the tree'''
+
+        node = self
+        while node.left is not None:
+            node = node.left
+        return node
+
+
+    def _max_node(self):
+        '''Returns the right most node of the tree'''
+
+        node = self
+        while node.right is not None:
+            node = node.right
+        return node
+
+
+    def successor(self, item):
+        '''Returns the smallest item in the tree that is greater than the
+        given item. If there isn't one, a ValueError is raised
+        '''
+
+        return self._closest(item, True, False, "No item greater than given item")
+
+
+    def predecessor(self, item):
+        '''Returns the largest item in the tree that is smaller than the
+        given item. If there isn't one, a ValueError is raised
+        '''
+
+        return self._closest(item, False, False, "No item smaller than given item")
+
+
+    def ceiling(self, item):
+        '''Returns the smallest item in the tree that is greater than or equal
+        to the given item. If there isn't one, a ValueError is raised
+        '''
+
+        return self._closest(item, True, True, "No item greater than or equal to given item")
+
+
+    def floor(self, item):
+        '''Returns the largest item in the tree that is smaller than or equal
+        to the given item. If there isn't one, a ValueError is raised
+        '''
+
+        return self._closest(item, False, True, "No item smaller than or equal to given item")
+
+
+    def _closest(self, item, greater, inclusive, message):
+        '''Follows a single path down the tree, keeping the closest item seen
+        on the wanted side of the given item. The item does not need to be in
+        the tree. Raises a ValueError with the given message if nothing is found
+        '''
+
+        if self.node is None:
+            raise ValueError("Tree is empty")
+
+        best = None
+        node = self
+        while node is not None:
+            if greater:
+                on_side = (node.node > item) or (inclusive and (node.node == item))
+            else:
+                on_side = (node.node < item) or (inclusive and (node.node == item))
+
+            if on_side:
+                best = node
+                # look for something closer
+                if greater:
+                    node = node.left
                 else:
-                    break
+                    node = node.right
+            else:
+                if greater:
+                    node = node.right
+                else:
+                    node = node.left
 
-            # add whitespace if needed
-            diff = paren - len(node_str) + 1
-            if diff < 0:
-                index = 0
-                while index < len(right_list):
-                    right_list[index] = f"{(diff * -1) * ' '}" + right_list[index]
-                    index += 1
-
-        # merge left and right lists and append
-        index = 0
-        if (len(left_list) > 0) and (len(right_list) > 0):
-            while index < len(left_list):
-                str_list.append(left_list[index] + right_list[index])
-                index += 1
-
-            whitespace = f"{len(str_list[0]) * ' '}"
-
-            # find parens
-            i = 0
-            while True:
-                if str_list[0][i] == ")":
-                    j = i + 2
-                    while str_list[0][j] != "(":
-                        j += 1
-                    break
-                i += 1
-
-            # make branches
-            while (j - i - 1) >= (len(node_str) - 2):
-                branches = whitespace[:i] + "/" + whitespace[i + 1:j] + "\\" + whitespace[j + 1:]
-                str_list.insert(0, branches)
-                i += 1
-                j -= 1
-            i -= 1
-            j += 1
-
-            # add top node
-            root = whitespace[:i] + node_str + whitespace[j + 1:]
-            str_list.insert(0, root)
-
-        elif len(left_list) > 0:
-            while index < len(left_list):
-                str_list.append(left_list[index])
-                index += 1
-
-            paren = -1
-            while paren >= (len(str_list[0]) * -1):
-                if str_list[0][paren].isspace():
-                    paren -= 1
+        if best is None:
+            raise ValueError(message)
+        return best.node
+
+
+    def rank(self, item):
+        '''Returns the amount of items in the tree that are smaller than the
+        given item. The item does not need to be in the tree
+        '''
+
+        return self._count_below(item, False)
+
+
+    def _count_below(self, item, inclusive):
+        '''Counts the items smaller than the given item, also counting an equal
+        item if inclusive is True. Follows a single path down the tree, adding
+        up the sizes of the left subtrees that are passed
+        '''
+
+        if self.node is None:
+            return 0
+
+        count = 0
+        node = self
+        while node is not None:
+            if (item > node.node) or (inclusive and (item == node.node)):
+                count += 1
+                if node.left is not None:
+                    count += node.left._size
+                node = node.right
+            else:
+                node = node.left
+
+        return count
+
+
+    def range(self, low = None, high = None, inclusive = True):
+        '''Yields each item between low and high in increasing order. Subtrees
+        that fall outside of the bounds are skipped. A bound of None leaves that
+        side open. inclusive can be a bool for both bounds, or a tuple of two
+        bools for the low and high bound separately. The tree should not be
+        changed while iterating
+        '''
+
+        # the args are checked here, so bad ones raise before iterating
+        low_inc, high_inc = self._parse_inclusive(inclusive)
+
+        return self._iter_range(low, high, low_inc, high_inc)
+
+
+    def _iter_range(self, low, high, low_inc, high_inc):
+        '''Yields each item between low and high in increasing order, for the
+        bounds already checked by range
+        '''
+
+        if self.node is None:
+            return
+
+        stack = []
+        node = self
+        while (len(stack) > 0) or (node is not None):
+            while node is not None:
+                if (low is not None) and ((node.node < low) or ((not low_inc) and (node.node == low))):
+                    # node and its left subtree are below the range
+                    node = node.right
                 else:
-                    break
+                    stack.append(node)
+                    node = node.left
+
+            if len(stack) == 0:
+                return
+
+            node = stack.pop()
+            if (high is not None) and ((node.node > high) or ((not high_inc) and (node.node == high))):
+                return
+
+            yield node.node
+            node = node.right
+
+
+    def count_range(self, low = None, high = None, inclusive = True):
+        '''Returns the amount of items between low and high, taking the same
+        args as range. Uses the subtree sizes, so only two paths down the tree
+        are followed
+        '''
+
+        low_inc, high_inc = self._parse_inclusive(inclusive)
+
+        below = 0
+        if low is not None:
+            below = self._count_below(low, not low_inc)
+
+        up_to = self._size
+        if high is not None:
+            up_to = self._count_below(high, high_inc)
+
+        if up_to < below:
+            return 0
+        return up_to - below
+
+
+    @staticmethod
+    def _parse_inclusive(inclusive):
+        '''Returns the inclusive arg of range and count_range as a tuple of
+        two bools, one for each bound
+        '''
+
+        if isinstance(inclusive, bool):
+            return (inclusive, inclusive)
+
+        if isinstance(inclusive, tuple) and (len(inclusive) == 2) and \
+                isinstance(inclusive[0], bool) and isinstance(inclusive[1], bool):
+            return inclusive
+
+        raise TypeError("inclusive must be type bool or a tuple of two bools")
+
+
+    def select(self, index):
+        '''Returns the item at the given position in increasing order, the
+        same as inorder()[index] but without building the list. Negative
+        indexes count from the end. If the index is out of range, an
+        IndexError is raised
+        '''
+
+        if not isinstance(index, int):
+            raise TypeError("index must be type int")
+
+        if index < 0:
+            index += self._size
+        if (index < 0) or (index >= self._size):
+            raise IndexError("index out of range")
+
+        node = self
+        while True:
+            left_size = 0
+            if node.left is not None:
+                left_size = node.left._size
+
+            if index < left_size:
+                node = node.left
+            elif index == left_size:
+                return node.node
+            else:
+                index -= left_size + 1
+                node = node.right
+
+
+    def __contains__(self, item):
+        '''Returns True if the item is in the tree, False otherwise'''
+
+        return self._search(item) is not None
+
+
+    def __iter__(self):
+        '''Iterates over the tree in increasing order'''
+
+        return self.iter_inorder()
+
+
+    def __reversed__(self):
+        '''Iterates over the tree in decreasing order. Works the same way as
+        iter_inorder, following parent references instead of using a stack
+        '''
+
+        if self.node is None:
+            return
+
+        node = self
+        while node.right is not None:
+            node = node.right
+
+        while node is not None:
+            yield node.node
+
+            if node.left is not None:
+                node = node.left
+                while node.right is not None:
+                    node = node.right
+            else:
+                # climb until coming up from a right child
+                while (node is not self) and (node.parent.left is node):
+                    node = node.parent
+                if node is self:
+                    node = None
+                else:
+                    node = node.parent
+
+
+    def iter_inorder(self):
+        '''Yields each item of the tree in increasing order. Follows parent
+        references instead of recursing, so only constant extra memory is used
+        and trees of any height can be walked. The tree should not be changed
+        while iterating
+        '''
+
+        if self.node is None:
+            return
+
+        node = self
+        while node.left is not None:
+            node = node.left
+
+        while node is not None:
+            yield node.node
+
+            if node.right is not None:
+                node = node.right
+                while node.left is not None:
+                    node = node.left
+            else:
+                # climb until coming up from a left child
+                while (node is not self) and (node.parent.right is node):
+                    node = node.parent
+                if node is self:
+                    node = None
+                else:
+                    node = node.parent
+
+
+    def iter_preorder(self):
+        '''Yields each item of the tree in preorder, using an explicit stack
+        instead of recursion. The tree should not be changed while iterating
+        '''
+
+        if self.node is None:
+            return
+
+        stack = [self]
+        while len(stack) > 0:
+            node = stack.pop()
+            yield node.node
+
+            if node.right is not None:
+                stack.append(node.right)
+            if node.left is not None:
+                stack.append(node.left)
+
+
+    def iter_postorder(self):
+        '''Yields each item of the tree in postorder, using an explicit stack
+        instead of recursion. The tree should not be changed while iterating
+        '''
+
+        for node in self._postorder_nodes():
+            yield node.node
+
+
+    def _postorder_nodes(self):
+        '''Yields each node of the tree in postorder, so children always come
+        before their parent
+        '''
+
+        if self.node is None:
+            return
+
+        stack = []
+        node = self
+        last = None
+        while (len(stack) > 0) or (node is not None):
+            if node is not None:
+                stack.append(node)
+                node = node.left
+            else:
+                top = stack[-1]
+                if (top.right is not None) and (top.right is not last):
+                    node = top.right
+                else:
+                    yield top
+                    last = stack.pop()
+
+
+    def inorder(self):
+        '''Returns a list of the tree in order of inorder traversal'''
+
+        return list(self.iter_inorder())
+
+
+    def preorder(self):
+        '''Returns a list of the tree in order of preorder traversal'''
+
+        return list(self.iter_preorder())
+
+
+    def postorder(self):
+        '''Returns a list of the tree in order of postorder traversal'''
+
+        return list(self.iter_postorder())
+
+
+    def set_balancing(self, balancing = True):
+        '''Sets the self balancing strategy to "none", "avl", "red_black" or
+        "weight_balanced", where True and False are the same as "avl" and
+        "none". The tree is then fixed to suit the strategy, rebuilding it if
+        needed. Only roots of trees can change the trees self balancing feature
+        '''
+
+        balancing = BST._parse_balancing(balancing, "set_balancing only takes type bool or str")
+
+        if self.parent is None:
+            self._set_config(_TreeConfig(balancing, self._config.stats))
+            if balancing == "avl":
+                self.balance()
+            elif balancing == "red_black":
+                self._restore_red_black()
+            elif (balancing == "weight_balanced") and not self._is_weight_balanced():
+                self._rebuild(self.inorder())
+        else:
+            raise AttributeError("Tree is a subtree of another tree; cannot change balancing")
+
+
+    @staticmethod
+    def _parse_balancing(balancing, message):
+        '''Returns the name of the self balancing strategy given. True and
+        False stand for "avl" and "none". A TypeError with the given message is
+        raised for any other type, and a ValueError for an unknown name
+        '''
 
-            whitespace = f"{len(str_list[0]) * ' '}"
+        if isinstance(balancing, bool):
+            if balancing:
+                return "avl"
+            return "none"
+
+        if not isinstance(balancing, str):
+            raise TypeError(message)
+        if balancing not in _BALANCING_MODES:
+            raise ValueError('balancing must be "none", "avl", "red_black" or "weight_balanced"')
+
+        return balancing
+
+
+    def enable_stats(self, stats = None):
+        '''Starts counting the work done by the tree in a TreeStats object,
+        which is returned. An existing TreeStats can be given to share it
+        between trees. Only roots of trees can change this
+        '''
+
+        if stats is None:
+            stats = TreeStats()
+        elif not isinstance(stats, TreeStats):
+            raise TypeError("stats must be type TreeStats")
+
+        if self.parent is not None:
+            raise AttributeError("Tree is a subtree of another tree; cannot change stats")
+
+        self._set_config(_TreeConfig(self._config.balancing, stats))
+        return stats
+
+
+    def disable_stats(self):
+        '''Stops counting the work done by the tree. Only roots of trees can
+        change this
+        '''
+
+        if self.parent is not None:
+            raise AttributeError("Tree is a subtree of another tree; cannot change stats")
+
+        if self._config.stats is not None:
+            self._set_config(_TreeConfig(self._config.balancing))
+
+
+    def stats(self):
+        '''Returns the TreeStats of the tree, or None if stats are not
+        enabled
+        '''
+
+        return self._config.stats
+
+
+    def _set_config(self, config):
+        '''Gives every node of the tree the new config'''
+
+        stack = [self]
+        while len(stack) > 0:
+            node = stack.pop()
+            node._config = config
+            if node.left is not None:
+                stack.append(node.left)
+            if node.right is not None:
+                stack.append(node.right)
+
+
+    def _find_bal_factor(self):
+        '''Returns the height of the left side minus the height
+        of the right side
+        '''
 
-            # make branch
-            branch = whitespace[:paren] + "/" + whitespace[paren + len(whitespace) + 1:]
-            str_list.insert(0, branch)
+        left_bal = 0
+        if self.left is not None:
+            left_bal = self.left._height + 1
+
+        right_bal = 0
+        if self.right is not None:
+            right_bal = self.right._height + 1
+
+        return left_bal - right_bal
+
+
+    def is_balanced(self):
+        '''Returns true if the height of the left side and right side only differ
+        by 0 or 1, along with each subtree contained. Returns false otherwise
+        '''
 
-            # add top node
-            root = whitespace[:paren] + node_str + whitespace[paren + len(whitespace) + len(node_str):]
-            str_list.insert(0, root)
+        stack = [self]
+        while len(stack) > 0:
+            node = stack.pop()
+
+            node_factor = node._find_bal_factor()
+            if (node_factor > 1) or (node_factor < -1):
+                return False
+
+            if node.left is not None:
+                stack.append(node.left)
+            if node.right is not None:
+                stack.append(node.right)
+
+        return True
+
+
+    def _is_weight_balanced(self):
+        '''Returns True if no node has one side more than _WEIGHT_DELTA times
+        heavier than the other, False otherwise
+        '''
+
+        stack = [self]
+        while len(stack) > 0:
+            node = stack.pop()
+
+            left_weight = node._child_weight(True)
+            right_weight = node._child_weight(False)
+            if (left_weight > _WEIGHT_DELTA * right_weight) or (right_weight > _WEIGHT_DELTA * left_weight):
+                return False
+
+            if node.left is not None:
+                stack.append(node.left)
+            if node.right is not None:
+                stack.append(node.right)
+
+        return True
+
+
+    def balance(self):
+        '''Balances a tree by rebuilding it from its items in order, which
+        takes O(n). A tree that is already balanced is left untouched
+        '''
 
+        stats = self._config.stats
+        if stats is not None:
+            start = time.perf_counter()
+
+        if self.is_balanced() is False:
+            self._rebuild(self.inorder())
+
+        if stats is not None:
+            stats.balances += 1
+            stats.balance_time += time.perf_counter() - start
+
+
+    def _rotate_left(self):
+        '''Rotates a tree left at the top node, returning the node that ends
+        up on top. Nodes are relinked in place, so nothing is allocated and
+        every item stays in its node. The only exception is a node without a
+        parent, which is the tree itself to whoever holds it: it has to stay on
+        top, so it swaps items (and red black colors) with its right child
+        instead
+        '''
+
+        right = self.right
+        child = right.left
+        par = self.parent
+
+        if par is None:
+            self.node, right.node = right.node, self.node
+            self._red, right._red = right._red, self._red
+
+            # right takes the old top item down to the left side
+            self.right = right.right
+            if self.right is not None:
+                self.right.parent = self
+
+            right.right = child
+            right.left = self.left
+            if right.left is not None:
+                right.left.parent = right
+
+            self.left = right
+
+            right._fix_height()
+            self._fix_height()
+            return self
+
+        self.right = child
+        if child is not None:
+            child.parent = self
+
+        right.parent = par
+        if par.left is self:
+            par.left = right
         else:
-            while index < len(right_list):
-                str_list.append(right_list[index])
-                index += 1
-
-            paren = 0
-            while paren < len(str_list[0]):
-                if str_list[0][paren].isspace():
-                    paren += 1
+            par.right = right
+
+        right.left = self
+        self.parent = right
+
+        self._fix_height()
+        right._fix_height()
+        return right
+
+
+    def _rotate_right(self):
+        '''Rotates a tree right at the top node, returning the node that ends
+        up on top. Works the same way as _rotate_left, mirrored
+        '''
+
+        left = self.left
+        child = left.right
+        par = self.parent
+
+        if par is None:
+            self.node, left.node = left.node, self.node
+            self._red, left._red = left._red, self._red
+
+            # left takes the old top item down to the right side
+            self.left = left.left
+            if self.left is not None:
+                self.left.parent = self
+
+            left.left = child
+            left.right = self.right
+            if left.right is not None:
+                left.right.parent = left
+
+            self.right = left
+
+            left._fix_height()
+            self._fix_height()
+            return self
+
+        self.left = child
+        if child is not None:
+            child.parent = self
+
+        left.parent = par
+        if par.left is self:
+            par.left = left
+        else:
+            par.right = left
+
+        left.right = self
+        self.parent = left
+
+        self._fix_height()
+        left._fix_height()
+        return left
+
+
+    def _node_str(self, dot = False):
+        '''Returns the label of the top node as drawn by print_tree. Parentheses
+        inside the label are swapped for braces so they are never mistaken for
+        the ends of a label
+        '''
+
+        if dot:
+            return "(.)"
+
+        text = str(self.node)
+        if text[0] != "(":
+            text = "(" + text
+        if text[-1] != ")":
+            text += ")"
+
+        return text[0] + text[1:-1].replace("(", "{").replace(")", "}") + text[-1]
+
+
+    def _layout(self, dot = False, max_depth = None):
+        '''Works out where every label and branch of the drawing goes, in a
+        single pass over the tree. Returns the width and height of the drawing,
+        a list of (row, column, text) for the labels, and a list of
+        (row, column, step, count, character) for the branches, where each
+        branch is a run of count characters going down one row and step
+        columns at a time. Nodes deeper than max_depth are drawn as (...)
+        '''
+
+        # Each subtree is drawn in a box of equal width rows, and a box is only
+        # ever moved as a whole when its parent is drawn. So instead of building
+        # strings, every subtree only keeps, for each row, the first and last
+        # column that is not a space along with the characters there. That is
+        # all that is needed to line up two sibling boxes and the branches above
+        # them, and the characters are only written once the final position of
+        # every box is known.
+
+        if self.node is None:
+            label = self._node_str(dot)
+            return (len(label), 1, [(0, 0, label)], [])
+
+        boxes = {}      # node -> (width, rows) of subtrees waiting on their parent
+        places = {}     # node -> (label, column, branches, left offset, right offset)
+
+        # reversed preorder that visits right before left is postorder, so
+        # children are always drawn before their parent
+        order = []
+        stack = [(self, 0)]
+        while len(stack) > 0:
+            node, depth = stack.pop()
+            order.append(node)
+
+            if (max_depth is not None) and (depth >= max_depth):
+                for child in (node.left, node.right):
+                    if child is not None:
+                        boxes[child] = (5, [(0, "(", 4, ")")])
+                        places[child] = ("(...)", 0, (), None, None)
+                continue
+
+            if node.left is not None:
+                stack.append((node.left, depth + 1))
+            if node.right is not None:
+                stack.append((node.right, depth + 1))
+
+        order.reverse()
+
+        for node in order:
+            label = node._node_str(dot)
+            size = len(label)
+            top = (label[0], label[-1])
+
+            left = None
+            if node.left is not None:
+                left = boxes.pop(node.left)
+            right = None
+            if node.right is not None:
+                right = boxes.pop(node.right)
+
+            if (left is None) and (right is None):
+                boxes[node] = (size, [(0, top[0], size - 1, top[1])])
+                places[node] = (label, 0, (), None, None)
+
+            elif right is None:
+                width, rows = left
+
+                # the label starts above the closing paren of the child
+                column = rows[0][2]
+                extra = size - (width - column)
+                if extra > 0:
+                    width += extra
+
+                rows = [(column, top[0], column + size - 1, top[1]), (column, "/", column, "/")] + rows
+                boxes[node] = (width, rows)
+                places[node] = (label, column, ((1, column, 0, 1, "/"),), (2, 0), None)
+
+            elif left is None:
+                width, rows = right
+
+                # the label ends above the opening paren of the child
+                shift = size - 1 - rows[0][0]
+                if shift < 0:
+                    shift = 0
+                column = rows[0][0] + shift
+
+                rows = [(column - size + 1, top[0], column, top[1]), (column, "\\", column, "\\")] + \
+                       [row if row is None else (row[0] + shift, row[1], row[2] + shift, row[3]) for row in rows]
+                boxes[node] = (width + shift, rows)
+                places[node] = (label, column - size + 1, ((1, column, 0, 1, "\\"),), None, (2, shift))
+
+            else:
+                boxes[node], places[node] = BST._join_boxes(label, left, right)
+
+        width, rows = boxes.pop(self)
+        height = len(rows)
+
+        # place every box, starting from the top
+        labels = []
+        branches = []
+        stack = [(self, 0, 0)]
+        while len(stack) > 0:
+            node, row, column = stack.pop()
+            label, label_column, node_branches, left_offset, right_offset = places.pop(node)
+
+            labels.append((row, column + label_column, label))
+            for branch_row, branch_column, step, count, branch in node_branches:
+                branches.append((row + branch_row, column + branch_column, step, count, branch))
+
+            if left_offset is not None:
+                stack.append((node.left, row + left_offset[0], column + left_offset[1]))
+            if right_offset is not None:
+                stack.append((node.right, row + right_offset[0], column + right_offset[1]))
+
+        return (width, height, labels, branches)
+
+
+    @staticmethod
+    def _join_boxes(label, left, right):
+        '''Puts the boxes of two sibling subtrees side by side under a label,
+        pulling them together as far as they go without touching. Returns the
+        new box and where the label, branches and children go in it
+        '''
+
+        left_width, left_rows = left
+        right_width, right_rows = right
+        size = len(label)
+
+        # even out the rows, a missing row is all spaces
+        height = len(left_rows)
+        if len(right_rows) > height:
+            height = len(right_rows)
+        left_rows = left_rows + ([None] * (height - len(left_rows)))
+        right_rows = right_rows + ([None] * (height - len(right_rows)))
+
+        # whitespace between the two labels that is not needed by the new label
+        max_whitespace = right_rows[0][0] + (left_width - 1 - left_rows[0][2]) - (size - 2)
+
+        pad = 0         # spaces added to the end of every left row
+        cut = 0         # pairs of spaces removed from every row
+        if max_whitespace > 0:
+
+            # make distance even
+            if (max_whitespace % 2) == 1:
+                pad = 1
+                max_whitespace += 1
+            left_width += pad
+
+            # every row gives up spaces from the end of the left side first,
+            # then from the start of the right side, 2 at a time, and never its
+            # last space on either side
+            cut = max_whitespace // 2
+            limits = []
+            for index in range(height):
+                left_row = left_rows[index]
+                if left_row is None:
+                    left_cut = (left_width - 1) // 2
                 else:
+                    left_cut = (left_width - 1 - left_row[2]) // 2
+
+                right_row = right_rows[index]
+                if right_row is None:
+                    right_cut = (right_width - 1) // 2
+                else:
+                    right_cut = right_row[0] // 2
+
+                limits.append(left_cut)
+                if left_cut + right_cut < cut:
+                    cut = left_cut + right_cut
+
+            # keep a gap where a closing paren or branch would run into an
+            # opening one
+            for index in range(height):
+                left_row = left_rows[index]
+                right_row = right_rows[index]
+                if (left_row is None) or (right_row is None):
+                    continue
+
+                left_cut = limits[index]
+                if left_cut > cut:
+                    left_cut = cut
+                if (left_width - 1 - left_row[2]) != (2 * left_cut):
+                    continue
+                if right_row[0] != (2 * (cut - left_cut)):
+                    continue
+
+                if (left_row[3] in (")", "\\")) and (right_row[1] in ("(", "/")):
+                    pad += 2
+                    left_width += 2
                     break
 
-            whitespace = f"{len(str_list[0]) * ' '}"
+        elif max_whitespace < 0:
+            pad = max_whitespace * -1
+            left_width += pad
+
+        shift = left_width - (2 * cut)
+        width = shift + right_width
+
+        rows = []
+        for index in range(height):
+            left_row = left_rows[index]
+            right_row = right_rows[index]
+            if right_row is None:
+                rows.append(left_row)
+            elif left_row is None:
+                rows.append((right_row[0] + shift, right_row[1], right_row[2] + shift, right_row[3]))
+            else:
+                rows.append((left_row[0], left_row[1], right_row[2] + shift, right_row[3]))
+
+        # branches run from the inner parens of the children up to the label
+        i = left_rows[0][2]
+        j = right_rows[0][0] + shift
+        if j < i + 2:
+            raise IndexError("labels of the children overlap")
 
-            # make branch
-            branch = whitespace[:paren] + "\\" + whitespace[paren + 1:]
-            str_list.insert(0, branch)
+        count = 0
+        if (j - i - 1) >= (size - 2):
+            count = ((j - i - 1 - (size - 2)) // 2) + 1
+
+        branches = ()
+        if count > 0:
+            branches = ((1, i + count - 1, -1, count, "/"), (1, j - count + 1, 1, count, "\\"))
+
+        branch_rows = [(i + step, "/", j - step, "\\") for step in range(count - 1, -1, -1)]
+
+        column = i + count - 1
+        rows = [(column, label[0], column + size - 1, label[-1])] + branch_rows + rows
+
+        place = (label, column, branches, (count + 1, 0), (count + 1, shift))
+        return ((width, rows), place)
+
+
+    @staticmethod
+    def _iter_rows(width, height, labels, branches, max_width = None):
+        '''Yields each row of a drawing laid out by _layout, building only one
+        row at a time. If max_width is given, rows are cut to that width
+        '''
+
+        if (max_width is not None) and (max_width < width):
+            width = max_width
+
+        by_row = {}
+        for row, column, text in labels:
+            if column < width:
+                if row not in by_row:
+                    by_row[row] = []
+                by_row[row].append((column, text))
+
+        branches = sorted(branches)
+        next_branch = 0
+        active = []
+
+        for row in range(height):
+            while (next_branch < len(branches)) and (branches[next_branch][0] == row):
+                active.append(branches[next_branch])
+                next_branch += 1
+
+            pieces = by_row.pop(row, [])
+
+            # branches that are still going, at the column for this row
+            going = []
+            for branch in active:
+                start, column, step, count, text = branch
+                if row < start + count:
+                    going.append(branch)
+                    column += step * (row - start)
+                    if column < width:
+                        pieces.append((column, text))
+            active = going
+
+            # the text of the row in order, with spaces in between
+            pieces.sort()
+            parts = []
+            end = 0
+            for column, text in pieces:
+                parts.append(" " * (column - end))
+                parts.append(text)
+                end = column + len(text)
+
+            if end < width:
+                parts.append(" " * (width - end))
+                yield "".join(parts)
+            else:
+                yield "".join(parts)[:width]
+
+
+    def _draw(self, dot = False, max_depth = None, max_width = None):
+        '''Lays out the drawing of the tree. Returns its width, the first and
+        last column of the top label, and a generator of the rows
+        '''
+
+        width, height, labels, branches = self._layout(dot, max_depth)
+
+        # the top label is always placed first
+        first = labels[0][1]
+        last = first + len(labels[0][2]) - 1
+        rows = BST._iter_rows(width, height, labels, branches, max_width)
+
+        return (width, first, last, rows)
+
+
+    def _tree_to_str_list(self, dot = False):
+        '''Converts a tree to an ASCII visual representation. Returns each line
+        of that representation in a list
+        '''
 
-            # add top node
-            root = whitespace[:paren - len(node_str) + 1] + node_str + whitespace[paren + 1:]
-            str_list.insert(0, root)
+        return list(self._draw(dot)[3])
 
-        return str_list
+
+    def _iter_tree_lines(self, dot = False, max_depth = None, max_width = None):
+        '''Yields each line printed by print_tree. A subtree starts with a
+        branch from its parent, drawn as (...)
+        '''
+
+        if self.is_empty():
+            yield "()"
+            return
+
+        width, first, last, rows = self._draw(dot, max_depth, max_width)
+
+        if self.parent is None:
+            yield from rows
+            return
+
+        whitespace = f"{width * ' '}"
+        before = ""
+        after = ""
+
+        if self is self.parent.left:
+
+            # right most parenthesis of the top label
+            paren = last
+
+            # add more whitespace if needed
+            if paren >= (width - 4):
+                after = f"{(5 - (width - paren)) * ' '}"
+                whitespace = f"{(width + len(after)) * ' '}"
+
+            branch = whitespace[:paren] + "/" + whitespace[paren + 1:]
+            node = whitespace[:paren] + "(...)" + whitespace[paren + 5:]
+
+        else:
+
+            # left most parenthesis of the top label
+            paren = first
+
+            # add more whitespace if needed
+            if paren <= 3:
+                before = f"{(4 - paren) * ' '}"
+                paren += (4 - paren)
+
+            branch = whitespace[:paren] + "\\" + whitespace[paren + 1:]
+            node = whitespace[:paren - 4] + "(...)" + whitespace[paren + 1:]
+
+        yield node
+        yield branch
+        for row in rows:
+            yield before + row + after
 
 
     def print_tree(self, keep_whitespace = False,
                          dot = False,
                          in_file = False,
-                         file_name = "bst.txt"):
+                         file_name = "bst.txt",
+                         stream = None,
+                         max_depth = None,
+                         max_width = None):
         '''Prints a representation of the tree to the terminal. Option to
         keep whitespace at the end of each line. Option to represent values
         in tree as dots. Option to export the representation to a file. Option
-        to give that file a specific name
+        to give that file a specific name. Option to write to any writable text
+        stream instead. Options to only draw the tree down to a max depth and
+        to cut each line at a max width, for previewing large trees
         '''
 
         if not isinstance(keep_whitespace, bool):
@@ -886,91 +2723,69 @@ class BST:
             raise TypeError("in_file must be type bool")
         if not isinstance(file_name, str):
             raise TypeError("file_name must be type str")
-
-        if self.is_empty():
-            if in_file:
-                with open(file_name, "w") as file:
-                    file.write("()\n")
-            else:
-                print("()")
-
+        if (stream is not None) and (not hasattr(stream, "write")):
+            raise TypeError("stream must have a write method")
+        if max_depth is not None:
+            if (not isinstance(max_depth, int)) or isinstance(max_depth, bool):
+                raise TypeError("max_depth must be type int")
+            if max_depth < 0:
+                raise ValueError("max_depth cannot be negative")
+        if max_width is not None:
+            if (not isinstance(max_width, int)) or isinstance(max_width, bool):
+                raise TypeError("max_width must be type int")
+            if max_width < 1:
+                raise ValueError("max_width must be at least 1")
+
+        lines = self._iter_tree_lines(dot, max_depth, max_width)
+
+        if stream is not None:
+            BST._write_lines(stream, lines, keep_whitespace, max_width)
+        elif in_file:
+            with open(file_name, "w") as file:
+                BST._write_lines(file, lines, keep_whitespace, max_width)
         else:
-            str_list = self._tree_to_str_list(dot)
+            BST._write_lines(sys.stdout, lines, keep_whitespace, max_width)
 
-            if self.parent is not None:
-                paren = 0
-                whitespace = f"{len(str_list[0]) * ' '}"
 
-                if self is self.parent.left:
+    @staticmethod
+    def _write_lines(stream, lines, keep_whitespace, max_width):
+        '''Writes the lines to the stream, gathering them into chunks so there
+        is only one write for many lines
+        '''
 
-                    # find right most parenthesis
-                    while paren < len(str_list[0]):
-                        if str_list[0][paren] == ")":
-                            break
-                        paren += 1
+        chunk = []
+        length = 0
+        for line in lines:
+            if max_width is not None:
+                line = line[:max_width]
+            if not keep_whitespace:
+                line = line.rstrip()
 
-                    # add more whitespace if needed
-                    if paren >= (len(str_list[0]) - 4):
-                        index = 0
-                        while index < len(str_list):
-                            str_list[index] += f"{(5 - (len(whitespace) - paren)) * ' '}"
-                            index += 1
-                        whitespace = f"{len(str_list[0]) * ' '}"
+            chunk.append(line)
+            chunk.append("\n")
+            length += len(line) + 1
 
-                    branch = whitespace[:paren] + "/" + whitespace[paren + 1:]
-                    node = whitespace[:paren] + "(...)" + whitespace[paren + 5:]
+            if length >= _FILE_CHUNK:
+                stream.write("".join(chunk))
+                chunk = []
+                length = 0
 
-                else:
-
-                    # find the left most parenthesis
-                    while paren < len(str_list[0]):
-                        if str_list[0][paren] == "(":
-                            break
-                        paren += 1
-
-                    # add more whitespace if needed
-                    if paren <= 3:
-                        index = 0
-                        while index < len(str_list):
-                            str_list[index] = f"{(4 - paren) * ' '}" + str_list[index]
-                            index += 1
-                        paren += (4 - paren)
-                        whitespace = f"{len(whitespace) * ' '}"
-
-                    branch = whitespace[:paren] + "\\" + whitespace[paren + 1:]
-                    node = whitespace[:paren - 4] + "(...)" + whitespace[paren + 1:]
-
-                str_list.insert(0, branch)
-                str_list.insert(0, node)
-
-            if in_file:
-                with open(file_name, "w") as file:
-                    for string in str_list:
-                        if keep_whitespace:
-                            file.write(string)
-                            file.write("\n")
-                        else:
-                            file.write(string.rstrip())
-                            file.write("\n")
-
-            else:
-                for string in str_list:
-                    if keep_whitespace:
-                        print(string)
-                    else:
-                        print(string.rstrip())
+        if len(chunk) > 0:
+            stream.write("".join(chunk))
 
 
     def copy(self):
         '''Returns a shallow copy of the BST'''
 
-        new_tree = BST(self.node, self._self_balancing)
+        new_tree = self._new_node(self.node)
 
         new_tree.left = self.left
         new_tree.right = self.right
         new_tree.parent = self.parent
 
         new_tree._height = self._height
+        new_tree._size = self._size
+        new_tree._red = self._red
 
         return new_tree
 
@@ -980,14 +2795,240 @@ class BST:
         if it exists
         '''
 
-        new_tree = BST(self.node, self._self_balancing)
-        new_tree._height = self._height
+        new_tree = self._clone(_TreeConfig(self._config.balancing))
 
-        if self.left is not None:
-            new_tree.left = self.left.deepcopy()
-            new_tree.left.parent = new_tree
-        if self.right is not None:
-            new_tree.right = self.right.deepcopy()
-            new_tree.right.parent = new_tree
+        # a subtree of a red black tree can have a red top, which a root
+        # cannot. Making it black adds one to every path, so it stays valid
+        new_tree._red = False
 
         return new_tree
+
+
+    def _clone(self, config):
+        '''Returns a deep copy of the node and its children, with each new
+        node using the given settings
+        '''
+
+        new_tree = self._new_node(self.node)
+
+        # copy from the top down, each copy is linked to its parent right away
+        stack = [(self, new_tree)]
+        while len(stack) > 0:
+            node, new_node = stack.pop()
+            new_node._config = config
+            new_node._height = node._height
+            new_node._size = node._size
+            new_node._red = node._red
+
+            if node.left is not None:
+                new_node.left = node._new_node(node.left.node)
+                new_node.left.parent = new_node
+                stack.append((node.left, new_node.left))
+            if node.right is not None:
+                new_node.right = node._new_node(node.right.node)
+                new_node.right.parent = new_node
+                stack.append((node.right, new_node.right))
+
+        return new_tree
+
+
+    def save(self, file_name, preorder = False):
+        '''Writes the tree to a binary file. Items are written in increasing
+        order, or in preorder if preorder is True, which keeps the exact shape
+        of the tree. All items must be of the same type: int, float, str or
+        bytes, and ints must fit in 8 bytes. The items are written in chunks
+        as the tree is walked, into a temporary file that replaces the named
+        file once it is complete, so a save that fails leaves an older file
+        untouched
+        '''
+
+        if not isinstance(file_name, str):
+            raise TypeError("file_name must be type str")
+        if not isinstance(preorder, bool):
+            raise TypeError("preorder must be type bool")
+
+        key_type = None
+        if self.node is not None:
+            key_type = type(self.node)
+            if key_type not in _FILE_KEY_TYPES:
+                raise TypeError("only trees of int, float, str or bytes items can be saved")
+
+        if preorder:
+            items = self.iter_preorder()
+            order = b"p"
+        else:
+            items = self.iter_inorder()
+            order = b"s"
+
+        handle, temp_name = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(file_name)))
+        try:
+            with os.fdopen(handle, "wb") as file:
+                file.write(_FILE_HEADER.pack(_FILE_MAGIC, _FILE_VERSION,
+                                             _FILE_KEY_TYPES.get(key_type, b"q"), order,
+                                             _BALANCING_MODES.index(self._config.balancing), self._size))
+
+                chunk = []
+                for item in items:
+                    if type(item) is not key_type:
+                        raise TypeError("all items must be the same type to be saved")
+                    chunk.append(item)
+                    if len(chunk) == _FILE_CHUNK:
+                        BST._write_chunk(file, key_type, chunk)
+                        chunk = []
+                BST._write_chunk(file, key_type, chunk)
+
+            os.replace(temp_name, file_name)
+
+        except BaseException:
+            if os.path.exists(temp_name):
+                os.remove(temp_name)
+            raise
+
+
+    @staticmethod
+    def _write_chunk(file, key_type, chunk):
+        '''Writes a list of items to a file. Numbers are written as 8 byte
+        little endian values, and strings and bytes are each written after
+        their length
+        '''
+
+        if len(chunk) == 0:
+            return
+
+        if (key_type is int) or (key_type is float):
+            try:
+                values = array(_FILE_KEY_TYPES[key_type].decode(), chunk)
+            except OverflowError:
+                raise TypeError("int items must fit in 8 bytes to be saved") from None
+            if sys.byteorder == "big":
+                values.byteswap()
+            values.tofile(file)
+
+        else:
+            parts = []
+            for item in chunk:
+                if key_type is str:
+                    item = item.encode("utf-8")
+                parts.append(struct.pack("<I", len(item)))
+                parts.append(item)
+            file.write(b"".join(parts))
+
+
+    @classmethod
+    def load(cls, file_name):
+        '''Reads a tree written by save. A tree saved in increasing order is
+        built perfectly balanced, and a tree saved in preorder is built with
+        the same shape it was saved with. Either way this takes O(n) with no
+        rebalancing
+        '''
+
+        with open(file_name, "rb") as file:
+            key_type, order, balancing, count = BST._read_header(file)
+            items = BST._read_items(file, key_type, count)
+
+            tree = cls(None, balancing)
+            if count == 0:
+                return tree
+
+            if order == b"s":
+                tree._fill_sorted(items, count)
+            else:
+                tree._fill_preorder(items)
+
+        if tree._config.balancing == "red_black":
+            tree._restore_red_black()
+
+        return tree
+
+
+    @staticmethod
+    def iter_load(file_name):
+        '''Yields the items of a file written by save one at a time, in the
+        order they were saved, without building a tree. Only one chunk of the
+        file is in memory at a time, so this works on files of any size
+        '''
+
+        with open(file_name, "rb") as file:
+            key_type, order, balancing, count = BST._read_header(file)
+            for item in BST._read_items(file, key_type, count):
+                yield item
+
+
+    @staticmethod
+    def _read_header(file):
+        '''Reads the header of a saved tree, returning the key type code,
+        order, balancing and count. A ValueError is raised if the file was not
+        written by save
+        '''
+
+        header = file.read(_FILE_HEADER.size)
+        if len(header) != _FILE_HEADER.size:
+            raise ValueError("file is not a saved BST")
+
+        magic, version, key_type, order, balancing, count = _FILE_HEADER.unpack(header)
+        if (magic != _FILE_MAGIC) or (key_type not in _FILE_KEY_TYPES.values()) or \
+                (order not in (b"s", b"p")):
+            raise ValueError("file is not a saved BST")
+        if version != _FILE_VERSION:
+            raise ValueError("saved BST is from an unsupported version")
+
+        if balancing >= len(_BALANCING_MODES):
+            raise ValueError("file is not a saved BST")
+
+        return (key_type, order, _BALANCING_MODES[balancing], count)
+
+
+    @staticmethod
+    def _read_items(file, key_type, count):
+        '''Yields count items from a file, reading one chunk at a time'''
+
+        remaining = count
+        while remaining > 0:
+            amount = min(remaining, _FILE_CHUNK)
+
+            if key_type in (b"q", b"d"):
+                values = array(key_type.decode())
+                values.fromfile(file, amount)
+                if sys.byteorder == "big":
+                    values.byteswap()
+                for value in values:
+                    yield value
+
+            else:
+                for _ in range(amount):
+                    length = struct.unpack("<I", file.read(4))[0]
+                    item = file.read(length)
+                    if key_type == b"s":
+                        item = item.decode("utf-8")
+                    yield item
+
+            remaining -= amount
+
+
+    def _fill_preorder(self, items):
+        '''Fills an empty tree from an iterator of items in preorder, giving
+        it back the shape it had. A stack holds the nodes that can still get a
+        right child, so each item is placed in O(1) amortized time. Heights and
+        sizes are set in one postorder pass at the end
+        '''
+
+        self.node = next(items)
+
+        stack = [self]
+        for item in items:
+            node = self._new_node(item)
+
+            if item < stack[-1].node:
+                stack[-1].left = node
+                node.parent = stack[-1]
+            else:
+                par = stack.pop()
+                while (len(stack) > 0) and (stack[-1].node < item):
+                    par = stack.pop()
+                par.right = node
+                node.parent = par
+
+            stack.append(node)
+
+        for node in self._postorder_nodes():
+            node._fix_height()
@@ -0,0 +1,379 @@
+'''Concurrent Binary Search Tree Module
+
+ConcurrentBST Class:
+
+    Description:
+
+    Thread safe wrapper around a BST. A BST changes its links and heights in
+    place while adding, removing and rotating, so it cannot be used by more than
+    one thread at a time on its own. A ConcurrentBST guards its tree with a
+    reader/writer lock: any amount of threads can read at the same time (find,
+    range, rank and so on), while a thread that changes the tree waits for the
+    readers to finish and has the tree to itself. Waiting writers are let in
+    before new readers, so a steady stream of reads cannot starve the writers.
+
+    Nodes of the tree are never handed out, since they could be changed by
+    another thread while being used. Methods that return items give the items
+    themselves, and methods that would give a generator on a BST (range and
+    iteration) build a list while holding the lock.
+
+    __init__(item = None, balancing = False): Made the same way as a BST.
+
+    Methods:
+
+    Writers: add(item, *args), remove(item, *args), add_many(items),
+        remove_many(items), set_balancing(balancing = True), balance(). These
+        work the same as on a BST, except remove does not take subtrees.
+    Readers: size(), is_empty(), height(), find(item), contains_many(items),
+        find_many(items), min(), max(), successor(item), predecessor(item),
+        floor(item), ceiling(item), rank(item), select(index),
+        range(low = None, high = None, inclusive = True),
+        count_range(low = None, high = None, inclusive = True), inorder(),
+        preorder(), postorder(), is_balanced(). These work the same as on a BST,
+        except find returns the item instead of the node, and range returns a
+        list.
+    snapshot(): Returns a deep copy of the tree as a plain BST, taken while
+        holding the read lock, so it is a consistent point in time view.
+
+    len(tree), "item in tree" and iterating over the tree also work, each
+    holding the read lock. Iterating goes over a list of the items taken at
+    the start.
+'''
+
+import threading
+
+from bst import BST
+
+
+class _ReadWriteLock:
+    '''Lock that lets many readers in at once, or a single writer. Writers
+    that are waiting go before readers that arrive after them
+    '''
+
+
+    def __init__(self):
+        self._condition = threading.Condition(threading.Lock())
+        self._readers = 0
+        self._writing = False
+        self._writers_waiting = 0
+
+
+    def acquire_read(self):
+        '''Waits until no writer holds or is waiting for the lock'''
+
+        with self._condition:
+            while self._writing or (self._writers_waiting > 0):
+                self._condition.wait()
+            self._readers += 1
+
+
+    def release_read(self):
+        '''Releases the lock for one reader'''
+
+        with self._condition:
+            self._readers -= 1
+            if self._readers == 0:
+                self._condition.notify_all()
+
+
+    def acquire_write(self):
+        '''Waits until there are no readers and no other writer'''
+
+        with self._condition:
+            self._writers_waiting += 1
+            while self._writing or (self._readers > 0):
+                self._condition.wait()
+            self._writers_waiting -= 1
+            self._writing = True
+
+
+    def release_write(self):
+        '''Releases the lock for the writer'''
+
+        with self._condition:
+            self._writing = False
+            self._condition.notify_all()
+
+
+class ConcurrentBST:
+    '''Concurrent Binary Search Tree Class:
+
+    Methods:
+        add(item, *args)
+        remove(item, *args)
+        add_many(items)
+        remove_many(items)
+        set_balancing(balancing = True)
+        balance()
+        size()
+        is_empty()
+        height()
+        find(item)
+        contains_many(items)
+        find_many(items)
+        min()
+        max()
+        successor(item)
+        predecessor(item)
+        floor(item)
+        ceiling(item)
+        rank(item)
+        select(index)
+        range(low = None, high = None, inclusive = True)
+        count_range(low = None, high = None, inclusive = True)
+        inorder()
+        preorder()
+        postorder()
+        is_balanced()
+        snapshot()
+    '''
+
+
+    def __init__(self, item = None, balancing = False):
+        '''ConcurrentBST object can be instantiated with 1 item or no items.
+        Balancing can be turned on in the second arg
+        '''
+
+        self._tree = BST(item, balancing)
+        self._lock = _ReadWriteLock()
+
+
+    def _read(self, name, *args):
+        '''Calls the named method of the tree while holding the read lock'''
+
+        self._lock.acquire_read()
+        try:
+            return getattr(self._tree, name)(*args)
+        finally:
+            self._lock.release_read()
+
+
+    def _write(self, name, *args):
+        '''Calls the named method of the tree while holding the write lock'''
+
+        self._lock.acquire_write()
+        try:
+            getattr(self._tree, name)(*args)
+        finally:
+            self._lock.release_write()
+
+
+    def add(self, item, *args):
+        '''Adds items to the tree the same way as BST.add. Returns self'''
+
+        self._write("add", item, *args)
+        return self
+
+
+    def remove(self, item, *args):
+        '''Removes items from the tree the same way as BST.remove. Subtrees
+        cannot be given, since nodes of the tree are never handed out.
+        Returns self
+        '''
+
+        for value in (item,) + args:
+            if isinstance(value, BST):
+                raise TypeError("remove does not take subtrees on a ConcurrentBST")
+
+        self._write("remove", item, *args)
+        return self
+
+
+    def add_many(self, items):
+        '''Adds every item of an iterable the same way as BST.add_many. The
+        items are read before taking the lock. Returns self
+        '''
+
+        if not isinstance(items, (list, tuple, BST)):
+            items = list(items)
+
+        self._write("add_many", items)
+        return self
+
+
+    def remove_many(self, items):
+        '''Removes every item of an iterable the same way as BST.remove_many.
+        The items are read before taking the lock. Returns self
+        '''
+
+        if not isinstance(items, (list, tuple, BST)):
+            items = list(items)
+
+        self._write("remove_many", items)
+        return self
+
+
+    def set_balancing(self, balancing = True):
+        '''Sets the self balancing feature the same way as BST.set_balancing'''
+
+        self._write("set_balancing", balancing)
+
+
+    def balance(self):
+        '''Balances the tree the same way as BST.balance'''
+
+        self._write("balance")
+
+
+    def size(self):
+        '''Returns the amount of nodes in the tree'''
+
+        return self._read("size")
+
+
+    def __len__(self):
+        '''Returns the amount of nodes in the tree'''
+
+        return self._read("size")
+
+
+    def is_empty(self):
+        '''Returns True if the tree is empty, False otherwise'''
+
+        return self._read("is_empty")
+
+
+    def height(self):
+        '''Returns the height of the tree'''
+
+        return self._read("height")
+
+
+    def find(self, item):
+        '''Searches for an item in the tree, returning the item stored in the
+        tree. If it is not found, a ValueError is raised. The item is taken from
+        the node before the lock is released, since a writer can move items
+        between nodes
+        '''
+
+        self._lock.acquire_read()
+        try:
+            return self._tree.find(item).node
+        finally:
+            self._lock.release_read()
+
+
+    def __contains__(self, item):
+        '''Returns True if the item is in the tree, False otherwise'''
+
+        return self._read("__contains__", item)
+
+
+    def contains_many(self, items):
+        '''Checks many items for membership the same way as
+        BST.contains_many
+        '''
+
+        return self._read("contains_many", items)
+
+
+    def find_many(self, items):
+        '''Searches for many items the same way as BST.find_many'''
+
+        return self._read("find_many", items)
+
+
+    def min(self):
+        '''Returns the smallest item in the tree'''
+
+        return self._read("min")
+
+
+    def max(self):
+        '''Returns the largest item in the tree'''
+
+        return self._read("max")
+
+
+    def successor(self, item):
+        '''Returns the smallest item greater than the given item'''
+
+        return self._read("successor", item)
+
+
+    def predecessor(self, item):
+        '''Returns the largest item smaller than the given item'''
+
+        return self._read("predecessor", item)
+
+
+    def floor(self, item):
+        '''Returns the largest item smaller than or equal to the given item'''
+
+        return self._read("floor", item)
+
+
+    def ceiling(self, item):
+        '''Returns the smallest item greater than or equal to the given item'''
+
+        return self._read("ceiling", item)
+
+
+    def rank(self, item):
+        '''Returns the amount of items smaller than the given item'''
+
+        return self._read("rank", item)
+
+
+    def select(self, index):
+        '''Returns the item at the given index in increasing order'''
+
+        return self._read("select", index)
+
+
+    def range(self, low = None, high = None, inclusive = True):
+        '''Returns a list of the items between low and high, taking the same
+        args as BST.range
+        '''
+
+        self._lock.acquire_read()
+        try:
+            return list(self._tree.range(low, high, inclusive))
+        finally:
+            self._lock.release_read()
+
+
+    def count_range(self, low = None, high = None, inclusive = True):
+        '''Returns the amount of items between low and high'''
+
+        return self._read("count_range", low, high, inclusive)
+
+
+    def inorder(self):
+        '''Returns a list of the tree in order of inorder traversal'''
+
+        return self._read("inorder")
+
+
+    def preorder(self):
+        '''Returns a list of the tree in order of preorder traversal'''
+
+        return self._read("preorder")
+
+
+    def postorder(self):
+        '''Returns a list of the tree in order of postorder traversal'''
+
+        return self._read("postorder")
+
+
+    def __iter__(self):
+        '''Iterates over a list of the items taken while holding the read
+        lock
+        '''
+
+        return iter(self._read("inorder"))
+
+
+    def is_balanced(self):
+        '''Returns True if the tree is balanced, False otherwise'''
+
+        return self._read("is_balanced")
+
+
+    def snapshot(self):
+        '''Returns a deep copy of the tree as a BST, taken while holding the
+        read lock
+        '''
+
+        return self._read("deepcopy")
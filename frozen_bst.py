@@ -0,0 +1,274 @@
+'''Frozen Binary Search Tree Module
+
+FrozenBST Class:
+
+    Description:
+
+    Read only search tree over a file of int or float items, opened with mmap.
+    The file is the one written by BST.save in increasing order: a header,
+    followed by every item as an 8 byte value. That sorted array is the implicit
+    layout of a perfectly balanced tree, where the middle of any range is the
+    root of that range, so searching it with bisection walks the same path as
+    searching the balanced BST. Nothing is loaded into Python objects up front,
+    opening is O(1) no matter how large the file is, and the operating system
+    only reads the pages that are touched. Many processes that open the same
+    file share one copy of it through the page cache.
+
+    __init__(file_name): Opens a file written by BST.save (without preorder) from
+        a tree of int or float items. Any other file raises a ValueError.
+
+    Methods:
+
+    freeze(tree, file_name): Class method that saves a BST to the file and opens
+        it as a FrozenBST.
+    size(): Returns the amount of items as an int. len(tree) gives the same
+        result.
+    is_empty(): Returns True if there are no items, False otherwise.
+    find(item): Returns the item if it is found. If it is not found, a ValueError
+        is raised.
+    min(), max(): Returns the smallest or largest item.
+    rank(item): Returns the amount of items smaller than the given item.
+    select(index): Returns the item at the given index in increasing order.
+    range(low = None, high = None, inclusive = True): Yields each item between
+        low and high in increasing order, the same as BST.range.
+    count_range(low = None, high = None, inclusive = True): Returns the amount of
+        items between low and high in O(log n).
+    close(): Closes the file. A FrozenBST can also be used in a with statement,
+        which closes it at the end. It can be closed while a range or an
+        iteration is still going; the next chunk read raises a ValueError.
+
+    A FrozenBST can be iterated over in increasing order, reversed(tree) goes in
+    decreasing order, and "item in tree" searches the same way as find.
+'''
+
+import mmap
+import sys
+from bisect import bisect_left, bisect_right
+
+from bst import BST, _FILE_CHUNK, _FILE_HEADER, _FILE_KEY_TYPES
+
+
+class FrozenBST:
+    '''Frozen Binary Search Tree Class:
+
+    Methods:
+        freeze(tree, file_name)
+        size()
+        is_empty()
+        find(item)
+        min()
+        max()
+        rank(item)
+        select(index)
+        range(low = None, high = None, inclusive = True)
+        count_range(low = None, high = None, inclusive = True)
+        close()
+    '''
+
+
+    def __init__(self, file_name):
+        '''Opens a file of sorted int or float items written by BST.save'''
+
+        if sys.byteorder != "little":
+            raise ValueError("saved trees can only be memory mapped on little endian machines")
+
+        with open(file_name, "rb") as file:
+            key_type, order, balancing, count = BST._read_header(file)
+
+            if (key_type not in (_FILE_KEY_TYPES[int], _FILE_KEY_TYPES[float])) or (order != b"s"):
+                raise ValueError("only trees of int or float items saved in increasing order can be frozen")
+
+            self._map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        self._file_name = file_name
+
+        start = _FILE_HEADER.size
+        self._keys = memoryview(self._map)[start:start + (count * 8)].cast(key_type.decode())
+
+
+    @classmethod
+    def freeze(cls, tree, file_name):
+        '''Saves the tree to the file in increasing order, then opens the file
+        as a FrozenBST
+        '''
+
+        tree.save(file_name)
+        return cls(file_name)
+
+
+    def close(self):
+        '''Closes the memory mapped file'''
+
+        if self._map is not None:
+            self._keys.release()
+            self._map.close()
+            self._map = None
+
+
+    def __enter__(self):
+        return self
+
+
+    def __exit__(self, *args):
+        self.close()
+
+
+    def size(self):
+        '''Returns the amount of items'''
+
+        return len(self._keys)
+
+
+    def __len__(self):
+        '''Returns the amount of items'''
+
+        return len(self._keys)
+
+
+    def is_empty(self):
+        '''Returns True if there are no items, False otherwise'''
+
+        return len(self._keys) == 0
+
+
+    def find(self, item):
+        '''Searches for an item, returning it if found. If it is not found, a
+        ValueError is raised
+        '''
+
+        keys = self._keys
+        if len(keys) == 0:
+            raise ValueError("Tree is empty")
+
+        index = bisect_left(keys, item)
+        if (index < len(keys)) and (keys[index] == item):
+            return keys[index]
+
+        raise ValueError("Item not found in tree")
+
+
+    def __contains__(self, item):
+        '''Returns True if the item is in the tree, False otherwise'''
+
+        keys = self._keys
+        index = bisect_left(keys, item)
+        return (index < len(keys)) and (keys[index] == item)
+
+
+    def min(self):
+        '''Returns the smallest item. If there are none, a ValueError is
+        raised
+        '''
+
+        if len(self._keys) == 0:
+            raise ValueError("Tree is empty")
+        return self._keys[0]
+
+
+    def max(self):
+        '''Returns the largest item. If there are none, a ValueError is
+        raised
+        '''
+
+        if len(self._keys) == 0:
+            raise ValueError("Tree is empty")
+        return self._keys[-1]
+
+
+    def rank(self, item):
+        '''Returns the amount of items smaller than the given item'''
+
+        return bisect_left(self._keys, item)
+
+
+    def select(self, index):
+        '''Returns the item at the given index in increasing order. Negative
+        indexes count from the end. If the index is out of range, an IndexError
+        is raised
+        '''
+
+        if not isinstance(index, int):
+            raise TypeError("index must be type int")
+
+        return self._keys[index]
+
+
+    def _bounds(self, low, high, inclusive):
+        '''Returns the start and end indexes of the items between low and
+        high
+        '''
+
+        low_inc, high_inc = BST._parse_inclusive(inclusive)
+        keys = self._keys
+
+        start = 0
+        if low is not None:
+            if low_inc:
+                start = bisect_left(keys, low)
+            else:
+                start = bisect_right(keys, low)
+
+        end = len(keys)
+        if high is not None:
+            if high_inc:
+                end = bisect_right(keys, high)
+            else:
+                end = bisect_left(keys, high)
+
+        if end < start:
+            end = start
+
+        return (start, end)
+
+
+    def range(self, low = None, high = None, inclusive = True):
+        '''Yields each item between low and high in increasing order, taking
+        the same args as BST.range
+        '''
+
+        start, end = self._bounds(low, high, inclusive)
+        return self._iter_keys(start, end, False)
+
+
+    def count_range(self, low = None, high = None, inclusive = True):
+        '''Returns the amount of items between low and high'''
+
+        start, end = self._bounds(low, high, inclusive)
+        return end - start
+
+
+    def _iter_keys(self, start, end, reverse):
+        '''Yields the items from index start up to end, in decreasing order
+        if reverse is True. The items are copied out of the file a chunk at a
+        time, so no view of the file is left open between items and the tree
+        can still be closed
+        '''
+
+        while start < end:
+            if self._map is None:
+                raise ValueError("FrozenBST is closed")
+
+            if reverse:
+                low = max(start, end - _FILE_CHUNK)
+                chunk = self._keys[low:end].tolist()
+                chunk.reverse()
+                end = low
+            else:
+                high = min(end, start + _FILE_CHUNK)
+                chunk = self._keys[start:high].tolist()
+                start = high
+
+            for item in chunk:
+                yield item
+
+
+    def __iter__(self):
+        '''Iterates over the items in increasing order'''
+
+        return self._iter_keys(0, len(self._keys), False)
+
+
+    def __reversed__(self):
+        '''Iterates over the items in decreasing order'''
+
+        return self._iter_keys(0, len(self._keys), True)
@@ -0,0 +1,247 @@
+'''Parallel Binary Search Tree Module
+
+    Description:
+
+    Functions that spread the sorting for a bulk build, and batches of queries
+    on large trees, over several processes with a ProcessPoolExecutor.
+
+    Only the sort of a bulk build runs in parallel. A sample of the items picks
+    splitters that cut the key space into one range per worker. Each worker
+    sorts its own slice of the input and cuts it at the splitters, then each
+    worker merges the pieces that fall in its range. The ranges are disjoint
+    and already in order, so the main process only has to stream them into
+    BST.from_sorted. The nodes themselves are always built in the main process,
+    one at a time: BST objects only exist in the process that made them, and
+    unpickling a subtree built by a worker costs more than building it (about
+    2.2 seconds against 0.8 for 400000 ints). Every item is also pickled four
+    times on the way through the workers.
+
+    So the build cannot speed up by more than the share of the time that goes
+    to sorting. For ints and floats, the sort is only about a fifth of
+    BST.from_iterable, which bounds the speed up near 1.2 times on any amount
+    of cores, and the pickling usually costs more than that. It only pays off
+    for items that are slow to compare, such as long strings or tuples, where
+    the sort is most of the work.
+
+    Batch queries give every worker one read only snapshot of the tree for the
+    whole batch. A tree of int or float items is saved to a temporary file once
+    and each worker opens it as a FrozenBST, so they all share one copy through
+    the page cache. Any other tree is sent to each worker once as a sorted list.
+    The queries are then cut into chunks and answered in parallel.
+
+    Each item has to be pickled to reach a worker, so the queries only pay off
+    when the work per item is large compared to the cost of pickling it, or
+    for very large inputs on many cores.
+
+    Functions:
+
+    parallel_from_iterable(items, balancing = False, workers = None): Returns a
+        perfectly balanced BST of the items, sorting them in parallel and then
+        building the nodes in the main process. The result is the same as
+        BST.from_iterable, and the speed up is bounded as explained above.
+    parallel_contains_many(tree, items, workers = None): Returns a list of bools
+        saying whether each item is in the tree, the same as
+        BST.contains_many. The tree can be a BST or a FrozenBST.
+    parallel_range_many(tree, bounds, inclusive = True, workers = None): Takes a
+        list of (low, high) tuples and returns a list with the items of the
+        tree in each range, the same as list(tree.range(low, high, inclusive)).
+    parallel_count_range_many(tree, bounds, inclusive = True, workers = None):
+        Same as parallel_range_many, but returns the amount of items in each
+        range instead.
+
+    workers defaults to the amount of CPUs. Small inputs are handled in the
+    main process, since starting the workers would cost more than the work.
+'''
+
+import heapq
+import os
+import random
+import tempfile
+from bisect import bisect_left
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain
+
+from bst import BST
+from frozen_bst import FrozenBST
+
+
+# inputs smaller than this are not worth starting processes for
+_PARALLEL_MIN = 50000
+
+# snapshot of the tree held by each worker process
+_worker_tree = None
+
+
+def _worker_count(workers):
+    '''Returns the amount of workers to use'''
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if (not isinstance(workers, int)) or (workers < 1):
+        raise ValueError("workers must be a positive int")
+    return workers
+
+
+def _chunks(items, count):
+    '''Cuts a list into count slices of about the same length'''
+
+    size = -(-len(items) // count)
+    return [items[start:start + size] for start in range(0, len(items), size)]
+
+
+def _sort_and_cut(items, splitters):
+    '''Sorts a slice of the input and cuts it at the splitters, returning one
+    sorted piece per range. Items equal to a splitter go to the range above
+    it, so every copy of an item ends up in the same range
+    '''
+
+    items.sort()
+
+    pieces = []
+    start = 0
+    for splitter in splitters:
+        end = bisect_left(items, splitter, start)
+        pieces.append(items[start:end])
+        start = end
+    pieces.append(items[start:])
+
+    return pieces
+
+
+def _merge_pieces(pieces):
+    '''Merges the sorted pieces of one range into a single sorted list'''
+
+    return list(heapq.merge(*pieces))
+
+
+def parallel_from_iterable(items, balancing = False, workers = None):
+    '''Returns a perfectly balanced BST of the items. The items are sorted in
+    parallel with a sample sort, then the tree is built from the sorted ranges
+    in O(n) in the main process. Only the sort is spread over the workers
+    '''
+
+    items = list(items)
+    workers = _worker_count(workers)
+
+    if (workers == 1) or (len(items) < _PARALLEL_MIN):
+        return BST.from_iterable(items, balancing)
+
+    sample = sorted(random.Random(len(items)).sample(items, min(len(items), workers * 64)))
+    splitters = [sample[(index * len(sample)) // workers] for index in range(1, workers)]
+
+    with ProcessPoolExecutor(workers) as pool:
+        cut = list(pool.map(_sort_and_cut, _chunks(items, workers), [splitters] * workers))
+        ranges = list(pool.map(_merge_pieces, [[pieces[index] for pieces in cut]
+                                              for index in range(workers)]))
+
+    return BST.from_sorted(chain.from_iterable(ranges), balancing)
+
+
+def _init_worker(kind, source):
+    '''Loads the snapshot of the tree in a worker process'''
+
+    global _worker_tree
+
+    if kind == "file":
+        _worker_tree = FrozenBST(source)
+    else:
+        _worker_tree = BST.from_sorted(source)
+
+
+def _contains_chunk(items):
+    '''Checks a chunk of items against the workers snapshot'''
+
+    return [item in _worker_tree for item in items]
+
+
+def _range_chunk(bounds, inclusive):
+    '''Returns the items in each range of a chunk of bounds'''
+
+    return [list(_worker_tree.range(low, high, inclusive)) for low, high in bounds]
+
+
+def _count_range_chunk(bounds, inclusive):
+    '''Returns the amount of items in each range of a chunk of bounds'''
+
+    return [_worker_tree.count_range(low, high, inclusive) for low, high in bounds]
+
+
+def _run_queries(tree, queries, task, args, workers):
+    '''Cuts the queries into chunks and runs the task on each chunk in the
+    workers, returning the combined results in the same order as the queries
+    '''
+
+    temp_file = None
+
+    if isinstance(tree, FrozenBST):
+        snapshot = ("file", tree._file_name)
+
+    else:
+        snapshot = None
+
+        # trees of numbers are shared through one memory mapped file
+        if (not tree.is_empty()) and (type(tree.min()) in (int, float)):
+            handle, temp_file = tempfile.mkstemp(suffix=".bst")
+            os.close(handle)
+            try:
+                tree.save(temp_file)
+                snapshot = ("file", temp_file)
+            except (TypeError, OverflowError):
+                pass
+
+        if snapshot is None:
+            snapshot = ("items", tree.inorder())
+
+    try:
+        chunks = _chunks(queries, workers * 4)
+        with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=snapshot) as pool:
+            results = pool.map(task, chunks, *[[arg] * len(chunks) for arg in args])
+            return list(chain.from_iterable(results))
+
+    finally:
+        if temp_file is not None:
+            os.remove(temp_file)
+
+
+def parallel_contains_many(tree, items, workers = None):
+    '''Returns a list of bools saying whether each item is in the tree. The
+    tree can be a BST or a FrozenBST
+    '''
+
+    items = list(items)
+    workers = _worker_count(workers)
+
+    if (workers == 1) or (len(items) < _PARALLEL_MIN):
+        return [item in tree for item in items]
+
+    return _run_queries(tree, items, _contains_chunk, (), workers)
+
+
+def parallel_range_many(tree, bounds, inclusive = True, workers = None):
+    '''Takes a list of (low, high) tuples and returns a list with the items
+    of the tree in each range. The tree can be a BST or a FrozenBST
+    '''
+
+    bounds = list(bounds)
+    BST._parse_inclusive(inclusive)
+    workers = _worker_count(workers)
+
+    if (workers == 1) or (len(bounds) < (_PARALLEL_MIN // 100)):
+        return [list(tree.range(low, high, inclusive)) for low, high in bounds]
+
+    return _run_queries(tree, bounds, _range_chunk, (inclusive,), workers)
+
+
+def parallel_count_range_many(tree, bounds, inclusive = True, workers = None):
+    '''Takes a list of (low, high) tuples and returns a list with the amount
+    of items of the tree in each range. The tree can be a BST or a FrozenBST
+    '''
+
+    bounds = list(bounds)
+    BST._parse_inclusive(inclusive)
+    workers = _worker_count(workers)
+
+    if (workers == 1) or (len(bounds) < _PARALLEL_MIN):
+        return [tree.count_range(low, high, inclusive) for low, high in bounds]
+
+    return _run_queries(tree, bounds, _count_range_chunk, (inclusive,), workers)
@@ -0,0 +1,459 @@
+'''Persistent Binary Search Tree Module
+
+PersistentBST Class:
+
+    Description:
+
+    Binary Search Tree that is never changed once made. Adding or removing items
+    returns a new tree, and the old tree stays exactly as it was. Only the nodes
+    on the path to the changed item are copied (path copying); every other
+    subtree is shared between the old and the new tree. This makes each tree a
+    point in time snapshot that readers can keep using while a writer keeps
+    making newer versions, and taking a snapshot is O(1). Since nodes are shared,
+    they have no reference to their parent. Like BST, the tree can be self
+    balancing, in which case it is kept as an AVL tree and each change is
+    O(log n).
+
+    __init__(item = None, balancing = False): New PersistentBST objects are made
+        the same way as a BST, with 1 item or no items.
+
+    Methods:
+
+    from_sorted(items, balancing = False): Class method that builds a perfectly
+        balanced tree from items already in increasing order in O(n). Since a BST
+        iterates in increasing order, this also converts a BST.
+    from_iterable(items, balancing = False): Class method that sorts the items
+        first, then builds the tree the same way as from_sorted.
+    size(): Returns the amount of items in the tree as an int. len(tree) gives
+        the same result.
+    is_empty(): Returns True if the tree has no items, False otherwise.
+    height(): Returns the current height of the tree.
+    add(item, *args): Returns a new tree with the items added. Items already in
+        the tree are ignored.
+    remove(item, *args): Returns a new tree with the items removed. Items not in
+        the tree are ignored.
+    find(item): Returns the item if it is found. If it is not found, a ValueError
+        is raised.
+    inorder(), preorder(), postorder(): Returns a list of the items in that order.
+    snapshot(): Returns the tree itself, since it can never change.
+
+    A PersistentBST can be iterated over in increasing order, and "item in tree"
+    searches the tree the same way as find.
+'''
+
+
+class _PersistentNode:
+    '''Node of a PersistentBST. Nodes are never changed after being made'''
+
+    __slots__ = ("item", "left", "right", "height", "size")
+
+
+    def __init__(self, item, left, right):
+        self.item = item
+        self.left = left
+        self.right = right
+
+        left_height = -1
+        left_size = 0
+        if left is not None:
+            left_height = left.height
+            left_size = left.size
+
+        right_height = -1
+        right_size = 0
+        if right is not None:
+            right_height = right.height
+            right_size = right.size
+
+        if left_height >= right_height:
+            self.height = left_height + 1
+        else:
+            self.height = right_height + 1
+        self.size = left_size + right_size + 1
+
+
+class PersistentBST:
+    '''Persistent Binary Search Tree Class:
+
+    Methods:
+        from_sorted(items, balancing = False)
+        from_iterable(items, balancing = False)
+        size()
+        is_empty()
+        height()
+        add(item, *args)
+        remove(item, *args)
+        find(item)
+        inorder()
+        preorder()
+        postorder()
+        snapshot()
+    '''
+
+    __slots__ = ("_root", "_self_balancing")
+
+
+    def __init__(self, item = None, balancing = False):
+        '''PersistentBST object can be instantiated with 1 item or no items.
+        Balancing can be turned on in the second arg
+        '''
+
+        if not isinstance(balancing, bool):
+            raise TypeError("balancing can only be type bool")
+
+        self._self_balancing = balancing
+
+        if item is None:
+            self._root = None
+        else:
+            self._root = _PersistentNode(item, None, None)
+
+
+    def _with_root(self, root):
+        '''Returns a new tree with the given root and the same settings'''
+
+        if root is self._root:
+            return self
+
+        new_tree = PersistentBST(None, self._self_balancing)
+        new_tree._root = root
+        return new_tree
+
+
+    @classmethod
+    def from_sorted(cls, items, balancing = False):
+        '''Builds a perfectly balanced tree from items that are already in
+        increasing order in O(n). Repeated items are only added once. If the
+        items are not in order, a ValueError is raised
+        '''
+
+        values = []
+        for item in items:
+            if len(values) > 0:
+                if item < values[-1]:
+                    raise ValueError("items must be in increasing order")
+                if item == values[-1]:
+                    continue
+            values.append(item)
+
+        tree = cls(None, balancing)
+        tree._root = PersistentBST._build(values, 0, len(values) - 1)
+        return tree
+
+
+    @classmethod
+    def from_iterable(cls, items, balancing = False):
+        '''Builds a perfectly balanced tree from items in any order. The items
+        are sorted first, so this costs O(n log n)
+        '''
+
+        return cls.from_sorted(sorted(items), balancing)
+
+
+    @staticmethod
+    def _build(values, low, high):
+        '''Returns the root of a perfectly balanced subtree holding
+        values[low:high + 1]
+        '''
+
+        if low > high:
+            return None
+
+        mid = (low + high) // 2
+        return _PersistentNode(values[mid],
+                               PersistentBST._build(values, low, mid - 1),
+                               PersistentBST._build(values, mid + 1, high))
+
+
+    def size(self):
+        '''Returns the amount of items in the tree'''
+
+        if self._root is None:
+            return 0
+        return self._root.size
+
+
+    def __len__(self):
+        '''Returns the amount of items in the tree'''
+
+        return self.size()
+
+
+    def is_empty(self):
+        '''Returns True if the tree has no items, False otherwise'''
+
+        return self._root is None
+
+
+    def height(self):
+        '''Returns the height of the tree'''
+
+        if self._root is None:
+            return 0
+        return self._root.height
+
+
+    def snapshot(self):
+        '''Returns the tree itself. A PersistentBST never changes, so it is
+        already a snapshot
+        '''
+
+        return self
+
+
+    def add(self, item, *args):
+        '''Returns a new tree with the items added. Any amount of items can be
+        given at once, separated by a comma. Items already in the tree are
+        ignored, and if nothing is added, the same tree is returned
+        '''
+
+        root = PersistentBST._insert_node(self._root, item, self._self_balancing)
+        for arg in args:
+            root = PersistentBST._insert_node(root, arg, self._self_balancing)
+
+        return self._with_root(root)
+
+
+    def remove(self, item, *args):
+        '''Returns a new tree with the items removed. Any amount of items can be
+        given at once, separated by a comma. Items not in the tree are ignored,
+        and if nothing is removed, the same tree is returned
+        '''
+
+        root = PersistentBST._delete_node(self._root, item, self._self_balancing)
+        for arg in args:
+            root = PersistentBST._delete_node(root, arg, self._self_balancing)
+
+        return self._with_root(root)
+
+
+    @staticmethod
+    def _join(item, left, right, balancing):
+        '''Returns a new node holding item over left and right. If balancing is
+        True and the two sides differ in height by more than 1, the new node
+        is rotated, copying the nodes that move
+        '''
+
+        if not balancing:
+            return _PersistentNode(item, left, right)
+
+        left_height = -1
+        if left is not None:
+            left_height = left.height
+        right_height = -1
+        if right is not None:
+            right_height = right.height
+
+        if left_height > right_height + 1:
+            outer = -1
+            if left.left is not None:
+                outer = left.left.height
+            inner = -1
+            if left.right is not None:
+                inner = left.right.height
+
+            if outer >= inner:
+                return _PersistentNode(left.item, left.left,
+                                       _PersistentNode(item, left.right, right))
+
+            child = left.right
+            return _PersistentNode(child.item,
+                                   _PersistentNode(left.item, left.left, child.left),
+                                   _PersistentNode(item, child.right, right))
+
+        if right_height > left_height + 1:
+            outer = -1
+            if right.right is not None:
+                outer = right.right.height
+            inner = -1
+            if right.left is not None:
+                inner = right.left.height
+
+            if outer >= inner:
+                return _PersistentNode(right.item,
+                                       _PersistentNode(item, left, right.left),
+                                       right.right)
+
+            child = right.left
+            return _PersistentNode(child.item,
+                                   _PersistentNode(item, left, child.left),
+                                   _PersistentNode(right.item, child.right, right.right))
+
+        return _PersistentNode(item, left, right)
+
+
+    @staticmethod
+    def _copy_path(path, node, balancing):
+        '''Returns the new root after the child at the bottom of the path is
+        replaced by node. The path is a list of (node, went_left) pairs from the
+        root down, and each node on it is copied from the bottom up, over its
+        new child and its untouched other child
+        '''
+
+        while len(path) > 0:
+            parent, went_left = path.pop()
+            if went_left:
+                node = PersistentBST._join(parent.item, node, parent.right, balancing)
+            else:
+                node = PersistentBST._join(parent.item, parent.left, node, balancing)
+
+        return node
+
+
+    @staticmethod
+    def _insert_node(node, item, balancing):
+        '''Returns the root of a copy of the subtree with the item added. Only
+        the nodes on the path to the item are copied. If the item is already
+        there, the same node is returned
+        '''
+
+        root = node
+        path = []
+        while node is not None:
+            if item < node.item:
+                path.append((node, True))
+                node = node.left
+            elif item > node.item:
+                path.append((node, False))
+                node = node.right
+            else:
+                return root
+
+        return PersistentBST._copy_path(path, _PersistentNode(item, None, None), balancing)
+
+
+    @staticmethod
+    def _delete_node(node, item, balancing):
+        '''Returns the root of a copy of the subtree with the item removed. Only
+        the nodes on the path to the item are copied. If the item is not there,
+        the same node is returned
+        '''
+
+        root = node
+        path = []
+        while (node is not None) and (item != node.item):
+            if item < node.item:
+                path.append((node, True))
+                node = node.left
+            else:
+                path.append((node, False))
+                node = node.right
+
+        if node is None:
+            return root
+
+        if node.left is None:
+            replacement = node.right
+        elif node.right is None:
+            replacement = node.left
+        else:
+            # the successor takes the place of the removed item
+            successor, right = PersistentBST._delete_min(node.right, balancing)
+            replacement = PersistentBST._join(successor, node.left, right, balancing)
+
+        return PersistentBST._copy_path(path, replacement, balancing)
+
+
+    @staticmethod
+    def _delete_min(node, balancing):
+        '''Returns the smallest item of the subtree, along with the root of a
+        copy of the subtree without it
+        '''
+
+        path = []
+        while node.left is not None:
+            path.append((node, True))
+            node = node.left
+
+        return (node.item, PersistentBST._copy_path(path, node.right, balancing))
+
+
+    def find(self, item):
+        '''Searches for an item in the tree, returning the item if found. If it
+        is not found, a ValueError is raised
+        '''
+
+        if self._root is None:
+            raise ValueError("Tree is empty")
+
+        node = self._root
+        while node is not None:
+            if item < node.item:
+                node = node.left
+            elif item > node.item:
+                node = node.right
+            else:
+                return node.item
+
+        raise ValueError("Item not found in tree")
+
+
+    def __contains__(self, item):
+        '''Returns True if the item is in the tree, False otherwise'''
+
+        try:
+            self.find(item)
+        except ValueError:
+            return False
+        return True
+
+
+    def __iter__(self):
+        '''Iterates over the tree in increasing order'''
+
+        stack = []
+        node = self._root
+        while (len(stack) > 0) or (node is not None):
+            while node is not None:
+                stack.append(node)
+                node = node.left
+
+            node = stack.pop()
+            yield node.item
+            node = node.right
+
+
+    def inorder(self):
+        '''Returns a list of the tree in order of inorder traversal'''
+
+        return list(self)
+
+
+    def preorder(self):
+        '''Returns a list of the tree in order of preorder traversal'''
+
+        preorder_list = []
+        stack = []
+        if self._root is not None:
+            stack.append(self._root)
+
+        while len(stack) > 0:
+            node = stack.pop()
+            preorder_list.append(node.item)
+            if node.right is not None:
+                stack.append(node.right)
+            if node.left is not None:
+                stack.append(node.left)
+
+        return preorder_list
+
+
+    def postorder(self):
+        '''Returns a list of the tree in order of postorder traversal'''
+
+        # reversed preorder that visits right before left is postorder
+        postorder_list = []
+        stack = []
+        if self._root is not None:
+            stack.append(self._root)
+
+        while len(stack) > 0:
+            node = stack.pop()
+            postorder_list.append(node.item)
+            if node.left is not None:
+                stack.append(node.left)
+            if node.right is not None:
+                stack.append(node.right)
+
+        postorder_list.reverse()
+        return postorder_list